@@ -4,9 +4,15 @@ import cv2
 import matplotlib.pyplot as plt
 import pprint
 import json
+import os
+import signal
+import time
 from datetime import datetime
 from collections import deque
 
+from rendering import Renderer, make_sink
+from safety import SafetyLimits, SafetyMonitor
+
 
 class MoveNet:
     def __init__(self, model_path):
@@ -21,6 +27,7 @@ class MoveNet:
         self.pose_buffer = deque(maxlen=450)  # Store last 30 frames
         self.data_collection_mode = False
         self.current_session_data = []
+        self.sync_client = None  # Optional SyncClient uploading saved sessions
 
         self.edges = {
             (0, 1): "m",
@@ -62,7 +69,10 @@ class MoveNet:
             16: "right_ankle",
         }
 
-    def predict(self, frame):
+    def predict(self, frame, timestamp=None):
+        # Capture time of the frame, shared with the recorder to line video up
+        timestamp = timestamp or datetime.now()
+
         # Image reshaping - use self.amount for dynamic sizing
         img = frame.copy()
         img = tf.image.resize_with_pad(
@@ -80,31 +90,31 @@ class MoveNet:
         keypoints_with_scores = self.interpreter.get_tensor(output_details[0]["index"])
 
         # Store in buffer for sequence analysis
-        self._update_pose_buffer(keypoints_with_scores)
+        self._update_pose_buffer(keypoints_with_scores, timestamp)
 
         # Store for data collection if enabled
         if self.data_collection_mode:
-            self._store_session_data(keypoints_with_scores, frame.shape)
+            self._store_session_data(keypoints_with_scores, frame.shape, timestamp)
 
         return keypoints_with_scores
 
-    def _update_pose_buffer(self, keypoints):
+    def _update_pose_buffer(self, keypoints, timestamp):
         """Store keypoints in buffer for sequence analysis"""
         # Extract and normalize keypoints
         shaped_keypoints = np.squeeze(keypoints)
         if shaped_keypoints.shape[0] == 17:  # Ensure we have all keypoints
             self.pose_buffer.append(
                 {
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": timestamp.isoformat(),
                     "keypoints": shaped_keypoints.tolist(),
                 }
             )
 
-    def _store_session_data(self, keypoints, frame_shape):
+    def _store_session_data(self, keypoints, frame_shape, timestamp):
         """Store data for training collection"""
         if hasattr(self, "current_exercise") and hasattr(self, "current_quality"):
             session_entry = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp.isoformat(),
                 "keypoints": np.squeeze(keypoints).tolist(),
                 "frame_shape": frame_shape,
                 "exercise": self.current_exercise,
@@ -146,49 +156,85 @@ class MoveNet:
         with open(f"training_data/{filename}", "w") as f:
             json.dump(session_data, f)
 
+        if self.sync_client:
+            self.sync_client.enqueue(session_data)
+
         self.current_session_data = []
         return True
 
 
-def draw_keypoints(frame, keypoints, confidence_threshold):
-    y, x, c = frame.shape
-    shaped = np.squeeze(np.multiply(keypoints, [y, x, 1]))
+def draw_overlays(
+    frame, skeleton, keypoints_with_scores, form_result, pose_buffer, safety_alerts
+):
+    skeleton.draw(frame, keypoints_with_scores)
+
+    # Display analysis results
+    y_offset = 30
+    if form_result and "predicted_class" in form_result:
+        class_text = f"Form: {form_result['predicted_class']} ({form_result['confidence']:.2f})"
+        color = (
+            (0, 255, 0)
+            if form_result["predicted_class"] == "good"
+            else (
+                (0, 165, 255)
+                if form_result["predicted_class"] == "warning"
+                else (0, 0, 255)
+            )
+        )
+        cv2.putText(
+            frame,
+            class_text,
+            (10, y_offset),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            color,
+            2,
+        )
+        y_offset += 30
+
+        feedback_text = form_result["feedback"]
+        cv2.putText(
+            frame,
+            feedback_text,
+            (10, y_offset),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (255, 255, 255),
+            2,
+        )
 
-    count = 0
-    for kp in shaped:
-        ky, kx, kp_conf = kp
-        print(ky, kx, kp_conf)
-        if kp_conf > confidence_threshold:
-            cv2.circle(frame, (int(kx), int(ky)), 4, (0, 255, 0), -1)
+    # Display buffer status
+    buffer_status = f"Buffer: {len(pose_buffer)}/{pose_buffer.maxlen}"
+    cv2.putText(
+        frame,
+        buffer_status,
+        (10, frame.shape[0] - 20),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.5,
+        (255, 255, 255),
+        1,
+    )
+
+    # Safety alerts stay on screen for a few seconds
+    now = time.time()
+    for alert in safety_alerts:
+        if now - alert["timestamp"] < 3:
+            y_offset += 30
             cv2.putText(
                 frame,
-                str(count),
-                (int(kx), int(ky)),
+                f"{alert['severity'].upper()}: {alert['joint']} {alert['kind']}",
+                (10, y_offset),
                 cv2.FONT_HERSHEY_SIMPLEX,
-                1,
+                0.7,
                 (0, 0, 255),
                 2,
             )
-            count += 1
-
-    return frame
 
-
-def draw_connections(frame, keypoints, edges, confidence_threshold):
-    y, x, c = frame.shape
-    shaped = np.squeeze(np.multiply(keypoints, [y, x, 1]))
-
-    for edge, color in edges.items():
-        p1, p2 = edge
-        y1, x1, c1 = shaped[p1]
-        y2, x2, c2 = shaped[p2]
-
-        if (c1 > confidence_threshold) & (c2 > confidence_threshold):
-            cv2.line(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 0, 255), 2)
     return frame
 
 
-# Add to the render_window function:
+def stop_on_signal(signum, frame):
+    raise KeyboardInterrupt
 
 
 def render_window():
@@ -197,6 +243,57 @@ def render_window():
     # Initialize models
     model_path = "models/lightning.tflite"
     movenet_model = MoveNet(model_path)
+    renderer = Renderer(make_sink(os.environ.get("RENDER_SINK")), movenet_model.edges)
+
+    # Upload saved sessions to the therapist's backend when configured
+    sync_url = os.environ.get("SYNC_SERVER_URL")
+    if sync_url:
+        from sync import SyncClient
+
+        movenet_model.sync_client = SyncClient(sync_url)
+        movenet_model.sync_client.start()
+
+    # Per-patient movement limits, checked on every frame before anything else
+    safety_alerts = deque(maxlen=3)
+
+    def on_safety_alert(alert):
+        safety_alerts.append(alert)
+        print(
+            f"SAFETY {alert['severity'].upper()}: {alert['joint']} {alert['kind']} "
+            f"{alert['value']} (limit {alert['limit']})"
+        )
+
+    limits_path = os.environ.get("SAFETY_LIMITS")
+    safety_monitor = SafetyMonitor(
+        SafetyLimits.load(limits_path) if limits_path else None,
+        on_alert=on_safety_alert,
+    )
+
+    # Stream keypoints (never video) to therapists watching live when configured
+    live_publisher = None
+    live_url = os.environ.get("LIVE_SERVER_URL")
+    if live_url:
+        from live import LivePublisher
+
+        live_publisher = LivePublisher(
+            live_url, os.environ.get("LIVE_PATIENT_ID", "patient_001")
+        )
+        live_publisher.start()
+
+    # Record the camera feed next to the pose data when configured
+    recorder = None
+    record_dir = os.environ.get("RECORD_DIR")
+    if record_dir:
+        from recording import SessionRecorder
+
+        # RECORD_SIZE like "640x480"; unset keeps the camera resolution
+        record_size = os.environ.get("RECORD_SIZE")
+        recorder = SessionRecorder(
+            record_dir,
+            size=tuple(map(int, record_size.split("x"))) if record_size else None,
+            fps=int(os.environ.get("RECORD_FPS", 30)),
+            fourcc=os.environ.get("RECORD_FOURCC", "mp4v"),
+        )
 
     # Initialize exercise analyzer (optional - only if model exists)
     try:
@@ -209,83 +306,61 @@ def render_window():
         analysis_enabled = False
         print("Exercise form analyzer not available")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        h_diff = (frame.shape[1] - frame.shape[0]) // 2
-        frame = cv2.copyMakeBorder(
-            frame, h_diff, h_diff, 0, 0, cv2.BORDER_CONSTANT, None, value=0
-        )
-
-        # Get predictions
-        keypoints_with_scores = movenet_model.predict(frame)
-
-        # Analyze form if possible
-        form_result = None
-        if analysis_enabled and form_analyzer:
-            pose_sequence = movenet_model.get_pose_sequence()
-            if pose_sequence:
-                form_result = form_analyzer.analyze_form(pose_sequence)
-
-        # Render keypoints
-        draw_keypoints(frame, keypoints_with_scores, 0.4)
-
-        # Display analysis results
-        y_offset = 30
-        if form_result and "predicted_class" in form_result:
-            class_text = f"Form: {form_result['predicted_class']} ({form_result['confidence']:.2f})"
-            color = (
-                (0, 255, 0)
-                if form_result["predicted_class"] == "good"
-                else (
-                    (0, 165, 255)
-                    if form_result["predicted_class"] == "warning"
-                    else (0, 0, 255)
-                )
-            )
-            cv2.putText(
-                frame,
-                class_text,
-                (10, y_offset),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                color,
-                2,
-            )
-            y_offset += 30
-
-            feedback_text = form_result["feedback"]
-            cv2.putText(
-                frame,
-                feedback_text,
-                (10, y_offset),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (255, 255, 255),
-                2,
+    # Headless sinks have no "q" key; Ctrl-C and SIGTERM end the session instead
+    signal.signal(signal.SIGTERM, stop_on_signal)
+    try:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            captured_at = datetime.now()
+            if not ret:
+                break
+
+            h_diff = (frame.shape[1] - frame.shape[0]) // 2
+            frame = cv2.copyMakeBorder(
+                frame, h_diff, h_diff, 0, 0, cv2.BORDER_CONSTANT, None, value=0
             )
 
-        # Display buffer status
-        buffer_status = f"Buffer: {len(movenet_model.pose_buffer)}/{movenet_model.pose_buffer.maxlen}"
-        cv2.putText(
-            frame,
-            buffer_status,
-            (10, frame.shape[0] - 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (255, 255, 255),
-            1,
-        )
-
-        cv2.imshow("MoveNet Lightning", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
+            # Get predictions
+            keypoints_with_scores = movenet_model.predict(frame, captured_at)
+            safety_monitor.check(keypoints_with_scores, captured_at.timestamp())
+            if live_publisher:
+                live_publisher.publish(keypoints_with_scores, captured_at.timestamp())
+            if recorder:
+                # Before the overlays are drawn onto the frame
+                recorder.record(frame, captured_at)
+
+            # Analyze form if possible
+            form_result = None
+            if analysis_enabled and form_analyzer:
+                pose_sequence = movenet_model.get_pose_sequence()
+                if pose_sequence:
+                    form_result = form_analyzer.analyze_form(pose_sequence)
+
+            # Overlays are drawn only for frames the sink will actually show
+            if renderer.due():
+                draw_overlays(
+                    frame,
+                    renderer.skeleton,
+                    keypoints_with_scores,
+                    form_result,
+                    movenet_model.pose_buffer,
+                    safety_alerts,
+                )
+                renderer.show(frame, captured_at.timestamp())
+                if renderer.poll_key() == ord("q"):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        renderer.close()
+        if movenet_model.sync_client:
+            movenet_model.sync_client.stop()
+        if live_publisher:
+            live_publisher.stop()
+        if recorder:
+            recorder.stop()
+        print(f"Safety check timing: {safety_monitor.timing_report()}")
 
 
 def main():
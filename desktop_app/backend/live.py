@@ -0,0 +1,104 @@
+import logging
+import random
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Frame format, see fast_api/backend/app/live/hub.py
+FRAME_HEADER = struct.Struct("<Id")  # seq, capture time (unix seconds)
+SCALE = 65535  # keypoints and scores are in [0, 1]
+
+
+def encode_frame(seq, timestamp, keypoints_with_scores):
+    """114 bytes per frame: header plus 17 x (y, x, score) as uint16"""
+    keypoints = np.squeeze(keypoints_with_scores).reshape(17 * 3)
+    quantized = np.rint(np.clip(keypoints, 0, 1) * SCALE).astype("<u2")
+    return FRAME_HEADER.pack(seq & 0xFFFFFFFF, timestamp) + quantized.tobytes()
+
+
+class LivePublisher:
+    """Streams pose keypoints to the backend for therapists watching live.
+
+    `publish` only encodes the frame into a small drop-oldest buffer; a
+    background thread owns the WebSocket, so a slow or lost connection costs
+    the real-time loop nothing but stale frames. Reconnects with backoff.
+    """
+
+    def __init__(
+        self,
+        server_url,
+        patient_id,
+        max_fps=30,
+        buffer_size=8,
+        max_retry_delay=30,
+    ):
+        base = server_url.rstrip("/").replace("http", "ws", 1)
+        self.url = f"{base}/live/{patient_id}/publish"
+        self.min_interval = 1 / max_fps if max_fps else 0
+        self.max_retry_delay = max_retry_delay
+        self.retry_delay = 1
+        self.frames = deque(maxlen=buffer_size)
+        self.ready = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="live", daemon=True)
+        self.seq = 0
+        self.last_published = 0.0
+        self.dropped = 0
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        with self.ready:
+            self.ready.notify()
+        self.thread.join(timeout)
+
+    def publish(self, keypoints_with_scores, timestamp=None):
+        """Called from the real-time loop; never blocks on the network"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if timestamp - self.last_published < self.min_interval:
+            return
+        self.last_published = timestamp
+        frame = encode_frame(self.seq, timestamp, keypoints_with_scores)
+        self.seq += 1
+        with self.ready:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(frame)
+            self.ready.notify()
+
+    def _next_frame(self):
+        with self.ready:
+            while not self.frames and not self.stop_event.is_set():
+                self.ready.wait()
+            return self.frames.popleft() if self.frames else None
+
+    def _stream(self):
+        from websockets.sync.client import connect
+
+        with connect(self.url, open_timeout=10) as websocket:
+            logger.info("Live stream connected to %s", self.url)
+            self.retry_delay = 1
+            while True:
+                frame = self._next_frame()
+                if frame is None:
+                    return
+                websocket.send(frame)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self._stream()
+            except Exception as e:
+                logger.warning("Live stream disconnected: %s", e)
+                self.retry_delay = min(self.max_retry_delay, self.retry_delay * 2)
+                self.stop_event.wait(self.retry_delay * random.uniform(0.8, 1.2))
+                # Frames queued while offline are stale by now
+                with self.ready:
+                    self.frames.clear()
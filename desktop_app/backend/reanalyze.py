@@ -0,0 +1,233 @@
+"""Re-score stored sessions after a form model or analysis logic change.
+
+Sessions are sharded across a process pool; each worker loads the model once
+and scores its shard with batched model calls. Finished sessions are appended
+to a checkpoint, so an interrupted run resumes where it stopped, and sessions
+already scored with the current model and config are skipped.
+
+    python reanalyze.py --workers 8
+"""
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Bump when rep/analysis logic changes in a way that invalidates old results
+ANALYSIS_VERSION = 2
+ANALYSIS_CONFIG = {
+    "analysis_version": ANALYSIS_VERSION,
+    "sequence_length": 450,  # matches MoveNet.pose_buffer
+}
+
+_analyzer = None
+
+
+def file_version(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def config_version(config=ANALYSIS_CONFIG):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class Checkpoint:
+    """Append-only JSON lines of finished sessions; the last entry per session wins"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    self.done[entry["session"]] = entry
+
+    def is_current(self, session, model_version, config_version):
+        entry = self.done.get(session)
+        return (
+            entry is not None
+            and entry["status"] == "ok"
+            and entry["model_version"] == model_version
+            and entry["config_version"] == config_version
+        )
+
+    def record(self, entries):
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self.done[entry["session"]] = entry
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _init_worker(model_path):
+    # Runs once per process so the model is loaded once, not once per session
+    global _analyzer
+    from exercise_analyzer import ExerciseFormAnalyzer
+
+    _analyzer = ExerciseFormAnalyzer(model_path)
+
+
+def to_sequence(poses, length=ANALYSIS_CONFIG["sequence_length"]):
+    """Exactly `length` poses, like the full pose_buffer the live path scores.
+
+    Stored sessions hold one rep (48-180 frames), so they are front-padded with
+    their first pose, as if the buffer had filled while standing still.
+    """
+    if not poses:
+        raise ValueError("Session has no poses")
+    poses = poses[-length:]
+    return [poses[0]] * (length - len(poses)) + poses
+
+
+def _analyze_batch(sequences):
+    batch = getattr(_analyzer, "analyze_batch", None)
+    if batch is not None:
+        try:
+            return batch(sequences)
+        except Exception:
+            pass  # Score one by one below, so one bad sequence fails alone
+    results = []
+    for sequence in sequences:
+        try:
+            results.append(_analyzer.analyze_form(sequence))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _error(path, e):
+    return {"session": path, "status": "error", "error": repr(e)}
+
+
+def _write_result(path, metadata, result, output_dir, versions):
+    name = os.path.splitext(os.path.basename(path))[0]
+    output = os.path.join(output_dir, f"{name}.analysis.json")
+    with open(output + ".tmp", "w") as f:
+        json.dump({"metadata": metadata, "result": result, **versions}, f)
+    os.replace(output + ".tmp", output)
+
+
+def process_shard(paths, output_dir, versions, batch_size):
+    """Score one shard; returns checkpoint entries for every session in it.
+
+    Failures are recorded per session and never abort the rest of the shard.
+    """
+    entries = []
+    for start in range(0, len(paths), batch_size):
+        loaded, sequences = [], []
+        for path in paths[start : start + batch_size]:
+            try:
+                with open(path) as f:
+                    session = json.load(f)
+                metadata = session["metadata"]
+                sequence = to_sequence(session["poses"])
+            except Exception as e:
+                entries.append(_error(path, e))
+                continue
+            loaded.append((path, metadata))
+            sequences.append(sequence)
+
+        if not loaded:
+            continue
+        for (path, metadata), result in zip(loaded, _analyze_batch(sequences)):
+            if isinstance(result, Exception):
+                entries.append(_error(path, result))
+                continue
+            try:
+                _write_result(path, metadata, result, output_dir, versions)
+            except Exception as e:
+                entries.append(_error(path, e))
+                continue
+            entries.append({"session": path, "status": "ok", **versions})
+    return entries
+
+
+def reanalyze(
+    pattern, model_path, output_dir, workers, shard_size, batch_size, force=False
+):
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+    versions = {
+        "model_version": file_version(model_path),
+        "config_version": config_version(),
+    }
+
+    sessions = sorted(glob.glob(pattern))
+    pending = [
+        path
+        for path in sessions
+        if force or not checkpoint.is_current(path, **versions)
+    ]
+    print(f"{len(sessions)} sessions, {len(pending)} out of date")
+    if not pending:
+        return 0
+
+    shards = [pending[i : i + shard_size] for i in range(0, len(pending), shard_size)]
+    started = time.monotonic()
+    done = errors = 0
+    # Spawn, so workers don't inherit a half-initialized TensorFlow from the parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_path,),
+    ) as pool:
+        futures = {
+            pool.submit(process_shard, shard, output_dir, versions, batch_size): shard
+            for shard in shards
+        }
+        for future in as_completed(futures):
+            try:
+                entries = future.result()
+            except Exception as e:
+                # Worker process died; the shard is retried on the next run
+                entries = [_error(path, e) for path in futures[future]]
+            checkpoint.record(entries)
+            done += len(entries)
+            errors += sum(entry["status"] != "ok" for entry in entries)
+            rate = done / (time.monotonic() - started)
+            eta = (len(pending) - done) / rate if rate else 0
+            print(f"{done}/{len(pending)} sessions, {rate:.1f}/s, eta {eta:.0f}s")
+
+    print(f"Finished with {errors} error(s)")
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="training_data/session_*.json")
+    parser.add_argument("--model", default="models/exercise_form_model.h5")
+    parser.add_argument("--output", default="analysis")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard-size", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-score sessions already up to date"
+    )
+    args = parser.parse_args()
+    return reanalyze(
+        args.sessions,
+        args.model,
+        args.output,
+        args.workers,
+        args.shard_size,
+        args.batch_size,
+        args.force,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+import csv
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def open_writer(path, fourcc, fps, size, hardware=True):
+    """VideoWriter, asking the backend for hardware encoding where it has one"""
+    code = cv2.VideoWriter_fourcc(*fourcc)
+    if hardware and hasattr(cv2, "VIDEOWRITER_PROP_HW_ACCELERATION"):
+        writer = cv2.VideoWriter(
+            path,
+            cv2.CAP_ANY,
+            code,
+            fps,
+            size,
+            [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+        )
+        if writer.isOpened():
+            return writer
+    return cv2.VideoWriter(path, code, fps, size)
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Older versions would unlink the parent's segment when this process exits
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def encode(config):
+    """Encoder process main loop.
+
+    Reads "<slot> <timestamp>" lines on stdin, writes the slot's frame to the
+    video and its timestamp to the sidecar, then reports the slot free on
+    stdout. Ends when stdin closes.
+    """
+    shm = _attach(config["shm"])
+    slots = np.ndarray(config["shape"], dtype=np.uint8, buffer=shm.buf)
+    size = tuple(config["size"])
+    path = config["path"]
+    writer = open_writer(path, config["fourcc"], config["fps"], size)
+    frames = 0
+    frame = None
+    try:
+        with open(os.path.splitext(path)[0] + ".timestamps.csv", "w", newline="") as f:
+            sidecar = csv.writer(f)
+            sidecar.writerow(["frame", "timestamp"])
+            for line in sys.stdin:
+                slot, timestamp = line.split()
+                frame = slots[int(slot)]
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+                # Slot is free again once the encoder has its own copy of the pixels
+                print(slot, flush=True)
+                sidecar.writerow([frames, timestamp])
+                frames += 1
+    finally:
+        writer.release()
+        del slots, frame
+        shm.close()
+
+
+class SessionRecorder:
+    """Records the camera feed to disk without slowing the frame loop.
+
+    Frames are copied into a small shared memory ring and encoded by a separate
+    process, so the loop pays one memcpy per recorded frame. The encoder runs
+    this file as its main module, so it starts without importing TensorFlow.
+    When the encoder falls behind, frames are dropped rather than queued. Each
+    written frame's capture time goes to a `.timestamps.csv` next to the video,
+    in the same format as the pose timestamps, so video and keypoints can be
+    lined up.
+    """
+
+    def __init__(
+        self,
+        output_dir="recordings",
+        size=None,
+        fps=30,
+        fourcc="mp4v",
+        extension="mp4",
+        slots=8,
+    ):
+        self.output_dir = output_dir
+        self.size = size  # (width, height); None keeps the camera size
+        self.fps = fps
+        self.fourcc = fourcc
+        self.extension = extension
+        self.slot_count = slots
+        self.min_interval = 1 / fps
+        self.next_due = None
+        self.process = None
+        self.failed = False
+        self.path = None
+        self.recorded = 0
+        self.dropped = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start(self, frame_shape):
+        """Start the encoder; called on the first frame if not done up front"""
+        shape = (self.slot_count,) + tuple(frame_shape)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self.slots = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.free = queue.Queue()
+        for slot in range(self.slot_count):
+            self.free.put(slot)
+
+        name = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(self.output_dir, f"session_{name}.{self.extension}")
+        config = {
+            "shm": self.shm.name,
+            "shape": shape,
+            "path": self.path,
+            "fps": self.fps,
+            "size": self.size or (frame_shape[1], frame_shape[0]),
+            "fourcc": self.fourcc,
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(config)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        self.reader = threading.Thread(
+            target=self._collect_free_slots, name="recorder", daemon=True
+        )
+        self.reader.start()
+
+    def _collect_free_slots(self):
+        for line in self.process.stdout:
+            self.free.put(int(line))
+
+    def record(self, frame, timestamp):
+        """Called from the real-time loop; `timestamp` is the frame's capture time"""
+        if self.process is None:
+            self.start(frame.shape)
+        if self.failed:
+            return
+        seconds = timestamp.timestamp()
+        # Quarter interval of slack, so camera jitter doesn't skip frames at full rate
+        slack = self.min_interval / 4
+        if self.next_due is not None and seconds < self.next_due - slack:
+            return
+        self.next_due = max(seconds, self.next_due or seconds) + self.min_interval
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        self.slots[slot] = frame
+        try:
+            if self.process.poll() is not None:
+                raise BrokenPipeError(f"encoder exited with {self.process.returncode}")
+            self.process.stdin.write(f"{slot} {timestamp.isoformat()}\n")
+        except OSError as e:
+            # A dead encoder ends the recording, not the session
+            logger.error("Recording stopped, encoder failed: %s", e)
+            self.failed = True
+            return
+        self.recorded += 1
+
+    def stop(self, timeout=30):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass  # Encoder already gone; whatever it wrote is kept
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            logger.error("Encoder did not finish in %ss, killing it", timeout)
+            self.process.kill()
+            self.process.wait()
+        finally:
+            self.reader.join(timeout)
+            del self.slots
+            self.shm.close()
+            self.shm.unlink()
+        logger.info(
+            "Recorded %d frames to %s (%d dropped)",
+            self.recorded,
+            self.path,
+            self.dropped,
+        )
+
+
+if __name__ == "__main__":
+    encode(json.loads(sys.argv[1]))
@@ -0,0 +1,183 @@
+import time
+
+import cv2
+import numpy as np
+
+# MoveNet.edges color codes, in BGR
+EDGE_COLORS = {"m": (255, 0, 255), "c": (255, 255, 0), "y": (0, 255, 255)}
+KEYPOINT_COLOR = (0, 255, 0)
+KEYPOINT_RADIUS = 4
+
+
+def to_pixels(frame, keypoints_with_scores):
+    """(17, 2) int32 (x, y) pixel positions and (17,) scores"""
+    shaped = np.squeeze(keypoints_with_scores).reshape(17, 3)
+    height, width = frame.shape[:2]
+    points = np.rint(shaped[:, 1::-1] * (width, height)).astype(np.int32)
+    return points, shaped[:, 2]
+
+
+def draw_keypoints(frame, keypoints, confidence_threshold, labels=False):
+    points, scores = to_pixels(frame, keypoints)
+    visible = points[scores > confidence_threshold]
+    if len(visible):
+        # Zero-length segments with a thick pen are filled dots, all in one call
+        dots = np.repeat(visible[:, None, :], 2, axis=1)
+        cv2.polylines(frame, dots, False, KEYPOINT_COLOR, 2 * KEYPOINT_RADIUS)
+    if labels:
+        for index in np.flatnonzero(scores > confidence_threshold):
+            cv2.putText(
+                frame,
+                str(index),
+                tuple(int(v) for v in points[index]),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                1,
+                (0, 0, 255),
+                2,
+            )
+    return frame
+
+
+class SkeletonOverlay:
+    """Skeleton drawing with the edge list flattened to index arrays once.
+
+    Each frame costs one cv2.polylines call per edge color plus one for the
+    keypoints, instead of a call per line and per circle.
+    """
+
+    def __init__(self, edges, confidence_threshold=0.4):
+        self.confidence_threshold = confidence_threshold
+        self.groups = []
+        for code, color in EDGE_COLORS.items():
+            pairs = [edge for edge, edge_code in edges.items() if edge_code == code]
+            if pairs:
+                pairs = np.asarray(pairs, dtype=np.intp)
+                self.groups.append((color, pairs[:, 0].copy(), pairs[:, 1].copy()))
+
+    def draw_edges(self, frame, keypoints):
+        points, scores = to_pixels(frame, keypoints)
+        visible = scores > self.confidence_threshold
+        for color, starts, ends in self.groups:
+            shown = visible[starts] & visible[ends]
+            if shown.any():
+                lines = np.stack([points[starts[shown]], points[ends[shown]]], axis=1)
+                cv2.polylines(frame, lines, False, color, 2)
+        return frame
+
+    def draw(self, frame, keypoints):
+        self.draw_edges(frame, keypoints)
+        return draw_keypoints(frame, keypoints, self.confidence_threshold)
+
+
+def draw_connections(frame, keypoints, edges, confidence_threshold):
+    return SkeletonOverlay(edges, confidence_threshold).draw_edges(frame, keypoints)
+
+
+class NullSink:
+    """Headless: nothing is drawn or shown"""
+
+    active = False
+
+    def show(self, frame, timestamp=None):
+        pass
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+class WindowSink:
+    active = True
+
+    def __init__(self, title="MoveNet Lightning"):
+        self.title = title
+
+    def show(self, frame, timestamp=None):
+        cv2.imshow(self.title, frame)
+
+    def poll_key(self):
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        cv2.destroyWindow(self.title)
+
+
+class VideoFileSink:
+    """Writes the annotated frames on a constant `fps` timeline.
+
+    Frames are placed by their timestamps, repeated to fill gaps or skipped
+    when they arrive faster than `fps`, so the file plays back in real time
+    however fast the loop actually ran.
+    """
+
+    active = True
+
+    def __init__(self, path, fps=30, fourcc="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writer = None
+        self.started_at = None
+        self.written = 0
+
+    def show(self, frame, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(
+                self.path, self.fourcc, self.fps, (width, height)
+            )
+            self.started_at = timestamp
+        # Video frames that should exist up to and including this one
+        due = int((timestamp - self.started_at) * self.fps) + 1
+        while self.written < due:
+            self.writer.write(frame)
+            self.written += 1
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+
+
+def make_sink(spec, fps=30):
+    """"window" (default), "none", or "file:<path>" (e.g. from RENDER_SINK)"""
+    if not spec or spec == "window":
+        return WindowSink()
+    if spec == "none":
+        return NullSink()
+    if spec.startswith("file:"):
+        return VideoFileSink(spec[len("file:") :], fps)
+    raise ValueError(f"Unknown render sink: {spec}")
+
+
+class Renderer:
+    """Draws overlays only when the sink will show the frame, at most `max_fps`"""
+
+    def __init__(self, sink, edges, confidence_threshold=0.4, max_fps=30):
+        self.sink = sink
+        self.skeleton = SkeletonOverlay(edges, confidence_threshold)
+        self.min_interval = 1 / max_fps if max_fps else 0
+        self.last_shown = 0.0
+
+    def due(self):
+        if not self.sink.active:
+            return False
+        now = time.monotonic()
+        if now - self.last_shown < self.min_interval:
+            return False
+        self.last_shown = now
+        return True
+
+    def show(self, frame, timestamp=None):
+        self.sink.show(frame, timestamp)
+
+    def poll_key(self):
+        return self.sink.poll_key()
+
+    def close(self):
+        self.sink.close()
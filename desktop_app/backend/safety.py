@@ -0,0 +1,202 @@
+import json
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (a, b, c) keypoint triplets; the angle is measured at b
+JOINT_ANGLES = {
+    "left_elbow": (5, 7, 9),
+    "right_elbow": (6, 8, 10),
+    "left_shoulder": (11, 5, 7),
+    "right_shoulder": (12, 6, 8),
+    "left_hip": (5, 11, 13),
+    "right_hip": (6, 12, 14),
+    "left_knee": (11, 13, 15),
+    "right_knee": (12, 14, 16),
+}
+
+# Degrees and degrees per second; a therapist's per-patient file overrides these
+DEFAULT_LIMITS = {
+    "left_knee": {"min_angle": 45, "max_velocity": 400},
+    "right_knee": {"min_angle": 45, "max_velocity": 400},
+    "left_hip": {"min_angle": 50, "max_velocity": 400},
+    "right_hip": {"min_angle": 50, "max_velocity": 400},
+    "left_shoulder": {"max_angle": 170, "max_velocity": 500},
+    "right_shoulder": {"max_angle": 170, "max_velocity": 500},
+    "left_elbow": {"max_velocity": 600},
+    "right_elbow": {"max_velocity": 600},
+}
+
+SEVERITY_ORDER = {"stop": 0, "warning": 1}
+
+
+class SafetyLimits:
+    """Per-patient limits compiled into flat arrays, one slot per limited joint"""
+
+    def __init__(self, limits, stop_margin=15.0):
+        self.joints = [joint for joint in JOINT_ANGLES if joint in limits]
+        triplets = np.asarray(
+            [JOINT_ANGLES[joint] for joint in self.joints], dtype=np.intp
+        ).reshape(-1, 3)
+        self.a, self.b, self.c = (triplets[:, i].copy() for i in range(3))
+        # Missing limits become +-inf so every joint goes through the same checks
+        self.min_angle = self._column(limits, "min_angle", -np.inf)
+        self.max_angle = self._column(limits, "max_angle", np.inf)
+        self.max_velocity = self._column(limits, "max_velocity", np.inf)
+        # How far past a limit counts as an emergency stop rather than a warning
+        self.stop_margin = stop_margin
+
+    def _column(self, limits, key, missing):
+        return np.asarray(
+            [limits[joint].get(key, missing) for joint in self.joints],
+            dtype=np.float64,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """JSON like {"patient_id": ..., "stop_margin": 15, "joints": {...}}"""
+        with open(path) as f:
+            config = json.load(f)
+        return cls(config["joints"], config.get("stop_margin", 15.0))
+
+
+class SafetyMonitor:
+    """Checks every frame against the patient's joint angle and velocity limits.
+
+    Runs right after pose estimation and before anything else in the frame
+    loop; a check is a handful of numpy operations over the limited joints, and
+    its time is measured against a per-frame deadline. Alerts go to `on_alert`
+    synchronously, emergency stops first.
+    """
+
+    def __init__(
+        self,
+        limits=None,
+        on_alert=None,
+        deadline_ms=2.0,
+        min_confidence=0.3,
+        confirm_frames=2,
+        cooldown=1.0,
+    ):
+        self.limits = limits or SafetyLimits(DEFAULT_LIMITS)
+        self.on_alert = on_alert
+        self.deadline_ms = deadline_ms
+        self.min_confidence = min_confidence
+        # A violation must persist this many frames, to ignore keypoint jitter
+        self.confirm_frames = confirm_frames
+        self.cooldown = cooldown
+
+        joints = len(self.limits.joints)
+        self.previous_angles = np.full(joints, np.nan)
+        self.previous_time = None
+        self.streaks = np.zeros((2, joints), dtype=np.int32)  # angle, velocity
+        self.last_alert = {}
+
+        self.frames = 0
+        self.total_ms = 0.0
+        self.worst_ms = 0.0
+        self.deadline_misses = 0
+
+    def joint_angles(self, keypoints):
+        """Angles (degrees, 0-180) at every limited joint, NaN if not confident"""
+        limits = self.limits
+        a, b, c = keypoints[limits.a], keypoints[limits.b], keypoints[limits.c]
+        first = np.arctan2(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1])
+        second = np.arctan2(c[:, 0] - b[:, 0], c[:, 1] - b[:, 1])
+        angles = np.abs(np.degrees(second - first)) % 360
+        angles = np.where(angles > 180, 360 - angles, angles)
+        confidence = np.minimum(np.minimum(a[:, 2], b[:, 2]), c[:, 2])
+        return np.where(confidence >= self.min_confidence, angles, np.nan)
+
+    def check(self, keypoints_with_scores, timestamp=None):
+        """Evaluate one frame; returns the alerts raised for it"""
+        started = time.perf_counter()
+        timestamp = time.time() if timestamp is None else timestamp
+        limits = self.limits
+
+        angles = self.joint_angles(np.squeeze(keypoints_with_scores))
+        if self.previous_time is not None and timestamp > self.previous_time:
+            dt = timestamp - self.previous_time
+            velocity = np.abs(angles - self.previous_angles) / dt
+        else:
+            velocity = np.full_like(angles, np.nan)
+        self.previous_angles, self.previous_time = angles, timestamp
+
+        # NaN compares False, so joints without a confident reading never fire
+        below = limits.min_angle - angles
+        above = angles - limits.max_angle
+        angle_excess = np.fmax(below, above)
+        velocity_excess = velocity - limits.max_velocity
+        violated = np.stack([angle_excess > 0, velocity_excess > 0])
+        self.streaks = np.where(violated, self.streaks + 1, 0)
+
+        alerts = []
+        if (self.streaks >= self.confirm_frames).any():
+            alerts = self._alerts(angles, velocity, angle_excess, timestamp)
+
+        # Deadline covers the evaluation; alert handlers are the caller's time
+        self._record_timing((time.perf_counter() - started) * 1000)
+        for alert in alerts:
+            if self.on_alert:
+                self.on_alert(alert)
+        return alerts
+
+    def _alerts(self, angles, velocity, angle_excess, timestamp):
+        limits = self.limits
+        alerts = []
+        for kind, joint in zip(*np.nonzero(self.streaks >= self.confirm_frames)):
+            name = limits.joints[joint]
+            key = (name, int(kind))
+            if timestamp - self.last_alert.get(key, -np.inf) < self.cooldown:
+                continue
+            self.last_alert[key] = timestamp
+            if kind == 0:
+                value = angles[joint]
+                limit = (
+                    limits.min_angle[joint]
+                    if value < limits.min_angle[joint]
+                    else limits.max_angle[joint]
+                )
+                excess = angle_excess[joint]
+            else:
+                value = velocity[joint]
+                limit = limits.max_velocity[joint]
+                # Velocity margin is relative: stop_margin percent over the limit
+                excess = (value - limit) / limit * 100
+            alerts.append(
+                {
+                    "joint": name,
+                    "kind": "angle" if kind == 0 else "velocity",
+                    "value": round(float(value), 1),
+                    "limit": float(limit),
+                    "severity": "stop" if excess > limits.stop_margin else "warning",
+                    "timestamp": timestamp,
+                }
+            )
+        alerts.sort(key=lambda alert: SEVERITY_ORDER[alert["severity"]])
+        return alerts
+
+    def _record_timing(self, elapsed_ms):
+        self.frames += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.worst_ms:
+            self.worst_ms = elapsed_ms
+        if elapsed_ms > self.deadline_ms:
+            self.deadline_misses += 1
+            logger.warning(
+                "Safety check took %.3f ms (deadline %.1f ms)",
+                elapsed_ms,
+                self.deadline_ms,
+            )
+
+    def timing_report(self):
+        return {
+            "frames": self.frames,
+            "mean_ms": self.total_ms / self.frames if self.frames else 0.0,
+            "worst_ms": self.worst_ms,
+            "deadline_ms": self.deadline_ms,
+            "deadline_misses": self.deadline_misses,
+        }
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Wire format, see fast_api/backend/app/sessions/codec.py
+MAGIC = b"PSES"
+VERSION = 1
+SCALE = 4096  # keypoints are in [0, 1]; 1/4096 is well below a pixel
+CHANNELS = 17 * 3
+PREAMBLE = struct.Struct("<4sBI")
+
+
+def encode_session(session_data):
+    """Encode a saved session ({"metadata", "poses"}) as quantized int16 deltas.
+
+    Each keypoint channel is stored contiguously so the small frame-to-frame
+    deltas sit next to each other, which is what makes zlib effective here.
+    """
+    poses = session_data["poses"]
+    frames = len(poses)
+
+    keypoints = np.asarray([pose["keypoints"] for pose in poses], dtype=np.float32)
+    quantized = np.rint(keypoints.reshape(frames, CHANNELS) * SCALE)
+    quantized = np.clip(quantized, 0, 32767).astype(np.int16)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, CHANNELS), np.int16))
+
+    timestamps = [datetime.fromisoformat(pose["timestamp"]) for pose in poses]
+    started_at = timestamps[0]
+    offsets_ms = np.rint(
+        [(t - started_at).total_seconds() * 1000 for t in timestamps]
+    ).astype(np.int64)
+    frame_ms = np.diff(offsets_ms, prepend=0).astype("<i4")
+
+    payload = frame_ms.tobytes() + deltas.T.astype("<i2").tobytes()
+    header = json.dumps(
+        {
+            "metadata": session_data["metadata"],
+            "started_at": started_at.isoformat(),
+            "frame_shape": poses[0].get("frame_shape"),
+            "frames": frames,
+        }
+    ).encode()
+    return (
+        PREAMBLE.pack(MAGIC, VERSION, len(header))
+        + header
+        + zlib.compress(payload, 9)
+    )
+
+
+class TokenBucket:
+    """Caps average upload bandwidth while allowing one chunk-sized burst"""
+
+    def __init__(self, bytes_per_second, burst):
+        self.rate = bytes_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        refill = (now - self.updated) * self.rate
+        self.tokens = min(self.capacity, self.tokens + refill)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            time.sleep(-self.tokens / self.rate)
+
+
+class SyncClient:
+    """Offline-first uploader for finished sessions.
+
+    `enqueue` encodes the session into an outbox file (a few KB) and wakes a
+    background thread, which uploads it in resumable chunks. Anything left in
+    the outbox (no network, app closed) is picked up again on the next start.
+    """
+
+    def __init__(
+        self,
+        server_url,
+        outbox_dir="sync_outbox",
+        chunk_size=64 * 1024,
+        max_bytes_per_second=256 * 1024,
+        max_retry_delay=300,
+        idle_interval=60,
+        timeout=30,
+    ):
+        self.server_url = server_url.rstrip("/")
+        self.outbox_dir = outbox_dir
+        self.chunk_size = chunk_size
+        self.bandwidth = TokenBucket(max_bytes_per_second, chunk_size)
+        self.max_retry_delay = max_retry_delay
+        self.retry_delay = 1
+        self.idle_interval = idle_interval
+        self.timeout = timeout
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="sync", daemon=True)
+        os.makedirs(outbox_dir, exist_ok=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        self.wakeup.set()
+        self.thread.join(timeout)
+
+    def enqueue(self, session_data):
+        """Persist the session before returning, so stopping can never lose it"""
+        self._write_outbox(session_data)
+        self.wakeup.set()
+
+    def _write_outbox(self, session_data):
+        upload_id = uuid.uuid4().hex
+        path = os.path.join(self.outbox_dir, f"{upload_id}.pses")
+        with open(path + ".tmp", "wb") as f:
+            f.write(encode_session(session_data))
+        os.replace(path + ".tmp", path)
+        return path
+
+    def _outbox(self):
+        return sorted(
+            os.path.join(self.outbox_dir, name)
+            for name in os.listdir(self.outbox_dir)
+            if name.endswith(".pses")
+        )
+
+    def _request(self, method, path, body=None, content_type="application/json"):
+        request = urllib.request.Request(
+            f"{self.server_url}{path}",
+            data=body,
+            method=method,
+            headers={"Content-Type": content_type},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def _upload(self, path):
+        upload_id = os.path.basename(path)[: -len(".pses")]
+        with open(path, "rb") as f:
+            blob = f.read()
+
+        status = self._request(
+            "POST",
+            "/uploads",
+            json.dumps(
+                {
+                    "upload_id": upload_id,
+                    "size": len(blob),
+                    "sha256": hashlib.sha256(blob).hexdigest(),
+                }
+            ).encode(),
+        )
+        # Resume from whatever the server already has
+        offset = status["received"]
+        while offset < len(blob) and not self.stop_event.is_set():
+            chunk = blob[offset : offset + self.chunk_size]
+            self.bandwidth.consume(len(chunk))
+            status = self._request(
+                "PUT",
+                f"/uploads/{upload_id}?offset={offset}",
+                chunk,
+                "application/octet-stream",
+            )
+            offset = status["received"]
+        if offset < len(blob):
+            return
+
+        self._request("POST", f"/uploads/{upload_id}/complete")
+        os.remove(path)
+        logger.info("Uploaded session %s (%d bytes)", upload_id, len(blob))
+
+    def _sync_outbox(self):
+        """Upload everything in the outbox; returns how long to wait before next pass"""
+        for path in self._outbox():
+            if self.stop_event.is_set():
+                break
+            try:
+                self._upload(path)
+            except urllib.error.HTTPError as e:
+                if e.code == 422:
+                    # Rejected by the server; keep it aside instead of retrying forever
+                    logger.error("Server rejected %s: %s", path, e.read())
+                    os.replace(path, path + ".rejected")
+                    continue
+                logger.warning("Upload of %s failed: %s", path, e)
+                return self._backoff()
+            except (urllib.error.URLError, OSError) as e:
+                logger.warning("Sync server unreachable: %s", e)
+                return self._backoff()
+        self.retry_delay = 1
+        return self.idle_interval
+
+    def _backoff(self):
+        self.retry_delay = min(self.max_retry_delay, self.retry_delay * 2)
+        return self.retry_delay * random.uniform(0.8, 1.2)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wakeup.clear()
+            wait = self._sync_outbox()
+            self.wakeup.wait(wait)
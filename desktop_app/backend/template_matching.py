@@ -0,0 +1,211 @@
+import glob
+import json
+
+import numpy as np
+
+HIPS = (11, 12)
+SHOULDERS = (5, 6)
+
+
+def rep_to_array(rep):
+    """Accept pose dicts (pose_buffer / session "poses") or a (T, 17, 3) array"""
+    if isinstance(rep, np.ndarray):
+        return rep.reshape(len(rep), 17, 3).astype(np.float32)
+    keypoints = np.asarray([pose["keypoints"] for pose in rep], dtype=np.float32)
+    return keypoints.reshape(-1, 17, 3)
+
+
+def normalize_rep(rep, length=64, confidence_threshold=0.2):
+    """Body-centred, scale-free, fixed-length (length, 34) series for one rep.
+
+    Low-confidence keypoints carry the last confident position forward, the
+    skeleton is centred on the hips and scaled by torso length, and time is
+    linearly resampled so every rep and template has the same number of frames.
+    """
+    keypoints = rep_to_array(rep)
+    coords = keypoints[:, :, :2].copy()
+    confident = keypoints[:, :, 2] >= confidence_threshold
+
+    # Forward fill low-confidence points (index of the last confident frame)
+    frames = np.arange(len(coords))[:, None]
+    last_seen = np.maximum.accumulate(np.where(confident, frames, 0), axis=0)
+    coords = coords[last_seen, np.arange(17)[None, :]]
+
+    hips = coords[:, HIPS].mean(axis=1, keepdims=True)
+    shoulders = coords[:, SHOULDERS].mean(axis=1, keepdims=True)
+    torso = np.linalg.norm(shoulders - hips, axis=2).mean()
+    coords = (coords - hips) / max(float(torso), 1e-3)
+
+    flat = coords.reshape(len(coords), 34)
+    source = np.linspace(0, 1, len(flat))
+    target = np.linspace(0, 1, length)
+    resampled = np.empty((length, 34), dtype=np.float32)
+    for d in range(34):
+        resampled[:, d] = np.interp(target, source, flat[:, d])
+    return resampled
+
+
+def envelopes(series, radius):
+    """Running max/min over +-radius frames, for a (..., L, D) stack"""
+    padded = np.pad(
+        series,
+        [(0, 0)] * (series.ndim - 2) + [(radius, radius), (0, 0)],
+        mode="edge",
+    )
+    windows = np.lib.stride_tricks.sliding_window_view(
+        padded, 2 * radius + 1, axis=-2
+    )
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+
+def lb_keogh(query, upper, lower):
+    """LB_Keogh of one (L, D) query against (K, L, D) envelopes -> (K,)"""
+    # upper >= lower, so at most one side is violated per cell
+    violation = np.maximum(query - upper, lower - query)
+    np.maximum(violation, 0, out=violation)
+    return np.einsum("kld,kld->k", violation, violation)
+
+
+def banded_dtw(query, candidates, radius):
+    """Squared multivariate DTW of one (L, D) query against (K, L, D) candidates.
+
+    The recurrence is evaluated one anti-diagonal at a time; every cell on a
+    diagonal (inside the Sakoe-Chiba band) and every candidate is one numpy op.
+    """
+    count, length, _ = candidates.shape
+    # Pairwise squared distances via |a|^2 + |b|^2 - 2ab, one matmul per batch
+    cost = (
+        (candidates * candidates).sum(axis=2)[:, :, None]
+        + (query * query).sum(axis=1)[None, None, :]
+        - 2 * candidates @ query.T
+    )
+    cost = np.maximum(cost, 0)
+
+    acc = np.full((count, length + 1, length + 1), np.inf, dtype=np.float64)
+    acc[:, 0, 0] = 0.0
+    for s in range(2, 2 * length + 1):
+        lo = max(1, s - length, -((radius - s) // 2))
+        hi = min(length, s - 1, (s + radius) // 2)
+        if lo > hi:
+            continue
+        i = np.arange(lo, hi + 1)
+        j = s - i
+        best = np.minimum(
+            np.minimum(acc[:, i - 1, j - 1], acc[:, i - 1, j]), acc[:, i, j - 1]
+        )
+        acc[:, i, j] = cost[:, i - 1, j - 1] + best
+    return acc[:, length, length]
+
+
+class TemplateLibrary:
+    """Reference reps per exercise with a precomputed LB_Keogh envelope index.
+
+    Matching computes the lower bound against every template in one vectorized
+    step, then runs banded DTW only on candidates (cheapest bound first) that
+    can still beat the current k-th best distance.
+    """
+
+    def __init__(self, length=64, band=0.1, batch_size=16):
+        self.length = length
+        self.radius = max(1, int(round(band * length)))
+        self.batch_size = batch_size
+        self.templates = {}  # exercise -> (K, L, D)
+        self.labels = {}  # exercise -> list of labels (e.g. form quality)
+        self.upper = {}
+        self.lower = {}
+        self._pending = {}
+
+    def add(self, exercise, rep, label):
+        series = normalize_rep(rep, self.length)
+        self._pending.setdefault(exercise, []).append((series, label))
+
+    def build(self):
+        """Stack pending templates and (re)compute their envelopes"""
+        for exercise, entries in self._pending.items():
+            series = np.stack([series for series, _ in entries])
+            labels = [label for _, label in entries]
+            if exercise in self.templates:
+                series = np.concatenate([self.templates[exercise], series])
+                labels = self.labels[exercise] + labels
+            self.templates[exercise] = series
+            self.labels[exercise] = labels
+            upper, lower = envelopes(series, self.radius)
+            self.upper[exercise], self.lower[exercise] = upper, lower
+        self._pending = {}
+        return self
+
+    @classmethod
+    def from_sessions(cls, pattern="training_data/session_*.json", **kwargs):
+        """Build from saved data collection sessions (one rep per file)"""
+        library = cls(**kwargs)
+        for path in sorted(glob.glob(pattern)):
+            with open(path) as f:
+                session = json.load(f)
+            if session["poses"]:
+                metadata = session["metadata"]
+                library.add(
+                    metadata["exercise"], session["poses"], metadata["quality"]
+                )
+        return library.build()
+
+    def save(self, path):
+        arrays = {}
+        for exercise in self.templates:
+            arrays[f"{exercise}/templates"] = self.templates[exercise]
+            arrays[f"{exercise}/upper"] = self.upper[exercise]
+            arrays[f"{exercise}/lower"] = self.lower[exercise]
+            arrays[f"{exercise}/labels"] = np.asarray(self.labels[exercise])
+        np.savez_compressed(
+            path, __config__=np.asarray([self.length, self.radius]), **arrays
+        )
+
+    @classmethod
+    def load(cls, path, batch_size=16):
+        data = np.load(path)
+        length, radius = (int(v) for v in data["__config__"])
+        library = cls(length=length, batch_size=batch_size)
+        library.radius = radius
+        for key in data.files:
+            if key.endswith("/templates"):
+                exercise = key[: -len("/templates")]
+                library.templates[exercise] = data[key]
+                library.upper[exercise] = data[f"{exercise}/upper"]
+                library.lower[exercise] = data[f"{exercise}/lower"]
+                library.labels[exercise] = data[f"{exercise}/labels"].tolist()
+        return library
+
+    def match(self, exercise, rep, k=1):
+        """k nearest templates as [(distance, label, template_index)], plus stats"""
+        templates = self.templates[exercise]
+        query = normalize_rep(rep, self.length)
+        bounds = lb_keogh(query, self.upper[exercise], self.lower[exercise])
+        order = np.argsort(bounds)
+
+        best = []  # (squared distance, index), kept sorted, at most k
+        evaluated = 0
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            if len(best) == k:
+                # Everything left has a lower bound at least this large
+                batch = batch[bounds[batch] < best[-1][0]]
+                if len(batch) == 0:
+                    break
+            distances = banded_dtw(query, templates[batch], self.radius)
+            evaluated += len(batch)
+            best = sorted(best + list(zip(distances.tolist(), batch.tolist())))[:k]
+
+        matches = [(float(np.sqrt(d)), self.labels[exercise][i], i) for d, i in best]
+        return matches, {"templates": len(templates), "dtw_evaluated": evaluated}
+
+    def score_rep(self, exercise, rep, k=3):
+        """Form label by majority of the k nearest templates, in analyze_form style"""
+        matches, stats = self.match(exercise, rep, k)
+        labels = [label for _, label, _ in matches]
+        predicted = max(set(labels), key=labels.count)
+        return {
+            "predicted_class": predicted,
+            "confidence": labels.count(predicted) / len(labels),
+            "distance": matches[0][0],
+            "matches": matches,
+            **stats,
+        }
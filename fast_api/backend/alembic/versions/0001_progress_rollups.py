@@ -0,0 +1,65 @@
+"""progress rollups
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exercise_session",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("patient_id", sa.String(100), nullable=False),
+        sa.Column("exercise", sa.String(100), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("duration_seconds", sa.Float(), nullable=False),
+        sa.Column("frame_count", sa.Integer(), nullable=False),
+        sa.Column("rep_count", sa.Integer(), nullable=False),
+        sa.Column("rom_degrees", sa.Float(), nullable=True),
+        sa.Column("quality_score", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_exercise_session_patient_id", "exercise_session", ["patient_id"]
+    )
+    op.create_table(
+        "progress_rollup",
+        sa.Column("patient_id", sa.String(100), nullable=False),
+        sa.Column("period", sa.String(10), nullable=False),
+        sa.Column("exercise", sa.String(100), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("session_count", sa.Integer(), nullable=False),
+        sa.Column("rep_count", sa.Integer(), nullable=False),
+        sa.Column("duration_seconds", sa.Float(), nullable=False),
+        sa.Column("rom_sum", sa.Float(), nullable=False),
+        sa.Column("rom_count", sa.Integer(), nullable=False),
+        sa.Column("rom_min", sa.Float(), nullable=True),
+        sa.Column("rom_max", sa.Float(), nullable=True),
+        sa.Column("quality_sum", sa.Float(), nullable=False),
+        sa.Column("quality_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("patient_id", "period", "exercise", "period_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("progress_rollup")
+    op.drop_index("ix_exercise_session_patient_id", table_name="exercise_session")
+    op.drop_table("exercise_session")
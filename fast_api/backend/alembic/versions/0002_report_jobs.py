@@ -0,0 +1,49 @@
+"""report jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("patient_id", sa.String(100), nullable=False),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("format", sa.String(10), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("data_version", sa.String(100), nullable=False),
+        sa.Column("cache_key", sa.String(64), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("result_path", sa.String(500), nullable=True),
+        sa.Column("error", sa.String(5000), nullable=True),
+        sa.Column("worker_id", sa.String(100), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_report_job_cache_key", "report_job", ["cache_key"])
+    op.create_index("ix_report_job_status", "report_job", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_job_status", table_name="report_job")
+    op.drop_index("ix_report_job_cache_key", table_name="report_job")
+    op.drop_table("report_job")
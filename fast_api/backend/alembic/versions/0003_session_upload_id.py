@@ -0,0 +1,34 @@
+"""session upload id
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "exercise_session", sa.Column("upload_id", sa.String(64), nullable=True)
+    )
+    op.create_unique_constraint(
+        "uq_exercise_session_upload_id", "exercise_session", ["upload_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_exercise_session_upload_id", "exercise_session", type_="unique"
+    )
+    op.drop_column("exercise_session", "upload_id")
@@ -0,0 +1,43 @@
+"""report job cache key unique
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('queued', 'running', 'done')"
+
+
+def upgrade() -> None:
+    # Keep the newest of any duplicates created before the index existed
+    op.execute(
+        f"""
+        UPDATE report_job SET status = 'failed', error = 'Superseded'
+        WHERE {ACTIVE} AND id NOT IN (
+            SELECT max(id) FROM report_job WHERE {ACTIVE} GROUP BY cache_key
+        )
+        """
+    )
+    op.create_index(
+        "uq_report_job_cache_key",
+        "report_job",
+        ["cache_key"],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_report_job_cache_key", table_name="report_job")
@@ -0,0 +1,30 @@
+"""progress rollup recent index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_progress_rollup_recent",
+        "progress_rollup",
+        ["patient_id", "period", sa.text("period_start DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_progress_rollup_recent", table_name="progress_rollup")
@@ -0,0 +1,71 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from env import get_env
+from live.hub import FRAME_SIZE, hub
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+
+@router.get("")
+def list_streams():
+    return hub.streams()
+
+
+@router.websocket("/{patient_id}/publish")
+async def publish(websocket: WebSocket, patient_id: str):
+    """Desktop app side: one binary message per frame"""
+    await websocket.accept()
+    hub.publisher_connected(patient_id)
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            if len(frame) != FRAME_SIZE:
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+                return
+            hub.publish(patient_id, frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.publisher_disconnected(patient_id)
+
+
+@router.websocket("/{patient_id}/subscribe")
+async def subscribe(websocket: WebSocket, patient_id: str):
+    """Therapist dashboard side: receives the patient's frames as they arrive"""
+    env = get_env()
+    await websocket.accept()
+    subscriber = hub.subscribe(
+        patient_id, env.live_subscriber_buffer, env.live_max_consecutive_drops
+    )
+
+    async def forward():
+        while True:
+            await websocket.send_bytes(await subscriber.next_frame())
+
+    async def wait_for_disconnect():
+        # Viewers don't send anything; this only notices them leaving
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [
+        asyncio.create_task(forward()),
+        asyncio.create_task(wait_for_disconnect()),
+        asyncio.create_task(subscriber.evicted.wait()),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Before any await: a cancelled handler may not get past the next one
+        hub.unsubscribe(patient_id, subscriber)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if subscriber.evicted.is_set():
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Too slow, frames dropped"
+        )
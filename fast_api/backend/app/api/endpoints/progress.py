@@ -0,0 +1,33 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from api.schemas.progress import (
+    ExerciseSessionIn,
+    ExerciseSessionOut,
+    ProgressRollupOut,
+)
+from db.models.progress import ExerciseSession, ProgressRollup
+from db.session import get_db
+
+router = APIRouter(tags=["progress"])
+
+
+@router.post("/sessions", response_model=ExerciseSessionOut, status_code=201)
+def create_session(payload: ExerciseSessionIn, db: Session = Depends(get_db)):
+    return ExerciseSession.record(db, **payload.model_dump())
+
+
+@router.get(
+    "/patients/{patient_id}/progress", response_model=List[ProgressRollupOut]
+)
+def get_progress(
+    patient_id: str,
+    period: Literal["day", "week", "all"] = "week",
+    exercise: Optional[str] = None,
+    limit: int = Query(default=12, ge=1, le=366),
+    db: Session = Depends(get_db),
+):
+    # Reads only rollup rows, so cost doesn't grow with the patient's history
+    return ProgressRollup.get_for_patient(db, patient_id, period, exercise, limit)
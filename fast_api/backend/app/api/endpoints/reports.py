@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from api.exceptions import ReportNotReady
+from api.schemas.report import ReportJobOut, ReportRequest
+from db.models.report import DONE, ReportJob
+from db.session import get_db
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+MEDIA_TYPES = {"csv": "text/csv", "pdf": "application/pdf"}
+
+
+@router.post("", response_model=ReportJobOut, status_code=202)
+def request_report(payload: ReportRequest, db: Session = Depends(get_db)):
+    # Only queues the job (or returns a cached one); `run.py report-worker` renders it
+    return ReportJob.enqueue(
+        db,
+        payload.patient_id,
+        payload.kind,
+        payload.format,
+        payload.params.model_dump(),
+    )
+
+
+@router.get("/{job_id}", response_model=ReportJobOut)
+def get_report_job(job_id: int, db: Session = Depends(get_db)):
+    return ReportJob.get_job_by_id(db, job_id)
+
+
+@router.get("/{job_id}/download")
+def download_report(job_id: int, db: Session = Depends(get_db)):
+    job = ReportJob.get_job_by_id(db, job_id)
+    if job.status != DONE or job.requeue_if_missing(db):
+        raise ReportNotReady(job_id, job.status)
+    return FileResponse(
+        job.result_path,
+        media_type=MEDIA_TYPES[job.format],
+        filename=f"{job.kind}_report_{job.patient_id}.{job.format}",
+    )
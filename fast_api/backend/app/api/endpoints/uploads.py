@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from api.exceptions import UploadInvalid
+from api.schemas.upload import UPLOAD_ID_PATTERN, UploadCreate, UploadStatus
+from db.models.progress import ExerciseSession
+from db.session import get_db
+from sessions.codec import SessionDecodeError, decode_session
+from sessions.metrics import summarize_session
+from sessions.storage import UploadStore, get_upload_store
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+@router.post("", response_model=UploadStatus)
+def create_upload(
+    payload: UploadCreate, store: UploadStore = Depends(get_upload_store)
+):
+    received = store.create(payload.upload_id, payload.size, payload.sha256)
+    return UploadStatus(
+        upload_id=payload.upload_id, size=payload.size, received=received
+    )
+
+
+@router.get("/{upload_id}", response_model=UploadStatus)
+def get_upload(
+    upload_id: str = Path(pattern=UPLOAD_ID_PATTERN),
+    store: UploadStore = Depends(get_upload_store),
+    db: Session = Depends(get_db),
+):
+    exercise_session = ExerciseSession.get_by_upload_id(db, upload_id)
+    return UploadStatus(
+        upload_id=upload_id,
+        size=store.size(upload_id),
+        received=store.received(upload_id),
+        session_id=exercise_session.id if exercise_session else None,
+    )
+
+
+@router.put("/{upload_id}", response_model=UploadStatus)
+async def upload_chunk(
+    request: Request,
+    upload_id: str = Path(pattern=UPLOAD_ID_PATTERN),
+    offset: int = Query(ge=0),
+    store: UploadStore = Depends(get_upload_store),
+):
+    # Async only to read the raw body; the file I/O stays off the event loop
+    data = await request.body()
+    received = await run_in_threadpool(store.append, upload_id, offset, data)
+    size = await run_in_threadpool(store.size, upload_id)
+    return UploadStatus(upload_id=upload_id, size=size, received=received)
+
+
+@router.post("/{upload_id}/complete", response_model=UploadStatus)
+def complete_upload(
+    upload_id: str = Path(pattern=UPLOAD_ID_PATTERN),
+    store: UploadStore = Depends(get_upload_store),
+    db: Session = Depends(get_db),
+):
+    exercise_session = ExerciseSession.get_by_upload_id(db, upload_id)
+    if exercise_session is None:
+        blob = store.complete(upload_id)
+        if blob is None:
+            # Archived by an earlier call that failed before recording the session
+            with open(store.archive_path(upload_id), "rb") as f:
+                blob = f.read()
+        try:
+            session = decode_session(blob)
+        except SessionDecodeError as e:
+            raise UploadInvalid(upload_id, str(e))
+        exercise_session = ExerciseSession.record(
+            db, upload_id=upload_id, **summarize_session(session)
+        )
+
+    size = store.size(upload_id)
+    return UploadStatus(
+        upload_id=upload_id, size=size, received=size, session_id=exercise_session.id
+    )
@@ -0,0 +1,49 @@
+from fastapi import HTTPException, status
+
+
+class LecturerNotFound(HTTPException):
+    def __init__(self, lecturer_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lecturer {lecturer_id} not found",
+        )
+
+
+class ReportJobNotFound(HTTPException):
+    def __init__(self, job_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report job {job_id} not found",
+        )
+
+
+class ReportNotReady(HTTPException):
+    def __init__(self, job_id: int, job_status: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job {job_id} is {job_status}",
+        )
+
+
+class UploadNotFound(HTTPException):
+    def __init__(self, upload_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload_id} not found",
+        )
+
+
+class UploadOffsetMismatch(HTTPException):
+    def __init__(self, upload_id: str, received: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"upload_id": upload_id, "received": received},
+        )
+
+
+class UploadInvalid(HTTPException):
+    def __init__(self, upload_id: str, reason: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Upload {upload_id} rejected: {reason}",
+        )
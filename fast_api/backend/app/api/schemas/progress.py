@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExerciseSessionIn(BaseModel):
+    patient_id: str = Field(max_length=100)
+    exercise: str = Field(max_length=100)
+    started_at: datetime
+    duration_seconds: float = Field(default=0.0, ge=0)
+    frame_count: int = Field(default=0, ge=0)
+    rep_count: int = Field(default=0, ge=0)
+    rom_degrees: Optional[float] = Field(default=None, ge=0, le=360)
+    quality_score: Optional[float] = Field(default=None, ge=0, le=1)
+
+
+class ExerciseSessionOut(ExerciseSessionIn):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ProgressRollupOut(BaseModel):
+    exercise: str
+    period: Literal["day", "week", "all"]
+    period_start: date
+    session_count: int
+    rep_count: int
+    duration_seconds: float
+    rom_avg: Optional[float]
+    rom_min: Optional[float]
+    rom_max: Optional[float]
+    quality_avg: Optional[float]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReportParams(BaseModel):
+    period: Literal["day", "week", "all"] = "week"
+    exercise: Optional[str] = None
+    limit: int = Field(default=52, ge=1, le=366)
+
+
+class ReportRequest(BaseModel):
+    patient_id: str = Field(max_length=100)
+    kind: Literal["progress"] = "progress"
+    format: Literal["csv", "pdf"] = "pdf"
+    params: ReportParams = ReportParams()
+
+
+class ReportJobOut(BaseModel):
+    id: int
+    patient_id: str
+    kind: str
+    format: str
+    status: str
+    progress: float
+    data_version: str
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
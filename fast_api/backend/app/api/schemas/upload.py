@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+UPLOAD_ID_PATTERN = r"^[A-Za-z0-9_-]{8,64}$"
+
+
+class UploadCreate(BaseModel):
+    upload_id: str = Field(pattern=UPLOAD_ID_PATTERN)
+    size: int = Field(gt=0)
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+
+
+class UploadStatus(BaseModel):
+    upload_id: str
+    size: int
+    received: int
+    session_id: Optional[int] = None
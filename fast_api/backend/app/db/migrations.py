@@ -0,0 +1,35 @@
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from env import get_env
+from .session import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def run_migrations(revision: str = "head"):
+    """Upgrade the database once, serialized across processes and hosts.
+
+    The transaction-scoped advisory lock makes concurrent launchers wait for
+    whichever one got there first; the rest then find nothing left to do.
+    """
+    env = get_env()
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    config.attributes["configure_logger"] = False
+
+    with engine.begin() as connection:
+        logger.info("Waiting for migration lock %s", env.migration_lock_id)
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"),
+            {"lock_id": env.migration_lock_id},
+        )
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+    logger.info("Database upgraded to %s", revision)
@@ -0,0 +1,268 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, Mapped, mapped_column
+
+from ..session import Base
+
+PERIODS = ("day", "week", "all")
+# period_start used for the lifetime ("all") rollup row
+EPOCH = date(1970, 1, 1)
+
+
+def period_start(period: str, moment: datetime) -> date:
+    """Start of the rollup bucket `moment` falls into (weeks start on Monday)"""
+    day = moment.date()
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return EPOCH
+
+
+def to_naive_utc(moment: datetime) -> datetime:
+    """Aware datetimes become naive UTC; naive ones are taken as already UTC"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ExerciseSession(Base):
+    __tablename__ = "exercise_session"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    patient_id: Mapped[str] = mapped_column(String(100), index=True)
+    exercise: Mapped[str] = mapped_column(String(100))
+    started_at: Mapped[datetime] = mapped_column(DateTime)
+    duration_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    frame_count: Mapped[int] = mapped_column(Integer, default=0)
+    rep_count: Mapped[int] = mapped_column(Integer, default=0)
+    rom_degrees: Mapped[float] = mapped_column(Float, nullable=True)
+    quality_score: Mapped[float] = mapped_column(Float, nullable=True)
+    # Set for sessions uploaded by the desktop sync client
+    upload_id: Mapped[str] = mapped_column(String(64), nullable=True, unique=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+
+    def __str__(self):
+        return f"patient_id: {self.patient_id}, exercise: {self.exercise}, started_at: {self.started_at}, rep_count: {self.rep_count}"
+
+    @staticmethod
+    def record(session: Session, **fields):
+        """Store a new session and fold it into the rollups, in one transaction"""
+        # The column is naive; store UTC so rollups and `rebuild` bucket alike
+        fields["started_at"] = to_naive_utc(fields["started_at"])
+        exercise_session = ExerciseSession(**fields)
+        session.add(exercise_session)
+        session.flush()
+        ProgressRollup.apply_session(session, exercise_session)
+        session.commit()
+        return exercise_session
+
+    @staticmethod
+    def get_by_upload_id(session: Session, upload_id: str):
+        return (
+            session.query(ExerciseSession)
+            .filter(ExerciseSession.upload_id == upload_id)
+            .first()
+        )
+
+
+class ProgressRollup(Base):
+    """Per patient, exercise and period aggregates, maintained as sessions arrive.
+
+    Averages are stored as sum/count pairs so they can be updated incrementally.
+    """
+
+    __tablename__ = "progress_rollup"
+    __table_args__ = (
+        # Latest periods across all exercises, without reading older rows
+        Index(
+            "ix_progress_rollup_recent",
+            "patient_id",
+            "period",
+            text("period_start DESC"),
+        ),
+    )
+
+    patient_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)
+    exercise: Mapped[str] = mapped_column(String(100), primary_key=True)
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    session_count: Mapped[int] = mapped_column(Integer, default=0)
+    rep_count: Mapped[int] = mapped_column(Integer, default=0)
+    duration_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    rom_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    rom_count: Mapped[int] = mapped_column(Integer, default=0)
+    rom_min: Mapped[float] = mapped_column(Float, nullable=True)
+    rom_max: Mapped[float] = mapped_column(Float, nullable=True)
+    quality_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    quality_count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def rom_avg(self) -> Optional[float]:
+        return self.rom_sum / self.rom_count if self.rom_count else None
+
+    @property
+    def quality_avg(self) -> Optional[float]:
+        return self.quality_sum / self.quality_count if self.quality_count else None
+
+    @staticmethod
+    def apply_session(session: Session, exercise_session: ExerciseSession):
+        """Add one session to its day, week and lifetime rollup rows"""
+        rom = exercise_session.rom_degrees
+        quality = exercise_session.quality_score
+        rows = [
+            {
+                "patient_id": exercise_session.patient_id,
+                "period": period,
+                "exercise": exercise_session.exercise,
+                "period_start": period_start(period, exercise_session.started_at),
+                "session_count": 1,
+                "rep_count": exercise_session.rep_count or 0,
+                "duration_seconds": exercise_session.duration_seconds or 0.0,
+                "rom_sum": rom or 0.0,
+                "rom_count": 0 if rom is None else 1,
+                "rom_min": rom,
+                "rom_max": rom,
+                "quality_sum": quality or 0.0,
+                "quality_count": 0 if quality is None else 1,
+            }
+            for period in PERIODS
+        ]
+        statement = insert(ProgressRollup).values(rows)
+        table = ProgressRollup.__table__
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_={
+                **{
+                    name: table.c[name] + excluded[name]
+                    for name in (
+                        "session_count",
+                        "rep_count",
+                        "duration_seconds",
+                        "rom_sum",
+                        "rom_count",
+                        "quality_sum",
+                        "quality_count",
+                    )
+                },
+                # LEAST/GREATEST skip NULLs in Postgres
+                "rom_min": func.least(table.c.rom_min, excluded.rom_min),
+                "rom_max": func.greatest(table.c.rom_max, excluded.rom_max),
+                "updated_at": func.now(),
+            },
+        )
+        session.execute(statement)
+
+    @staticmethod
+    def rebuild(session: Session, patient_id: Optional[str] = None):
+        """Recompute rollups from raw sessions, e.g. after a backfill"""
+        cleanup = delete(ProgressRollup)
+        if patient_id is not None:
+            cleanup = cleanup.where(ProgressRollup.patient_id == patient_id)
+        session.execute(cleanup)
+
+        columns = [
+            "patient_id",
+            "period",
+            "exercise",
+            "period_start",
+            "session_count",
+            "rep_count",
+            "duration_seconds",
+            "rom_sum",
+            "rom_count",
+            "rom_min",
+            "rom_max",
+            "quality_sum",
+            "quality_count",
+        ]
+        # Inlined rather than bound so SELECT and GROUP BY match textually
+        buckets = {
+            "day": func.date_trunc(
+                literal_column("'day'"), ExerciseSession.started_at
+            ),
+            "week": func.date_trunc(
+                literal_column("'week'"), ExerciseSession.started_at
+            ),
+            "all": literal_column(f"'{EPOCH.isoformat()}'"),
+        }
+        for period, bucket in buckets.items():
+            bucket = cast(bucket, Date)
+            query = select(
+                ExerciseSession.patient_id,
+                literal(period),
+                ExerciseSession.exercise,
+                bucket,
+                func.count(),
+                func.coalesce(func.sum(ExerciseSession.rep_count), 0),
+                func.coalesce(func.sum(ExerciseSession.duration_seconds), 0.0),
+                func.coalesce(func.sum(ExerciseSession.rom_degrees), 0.0),
+                func.count(ExerciseSession.rom_degrees),
+                func.min(ExerciseSession.rom_degrees),
+                func.max(ExerciseSession.rom_degrees),
+                func.coalesce(func.sum(ExerciseSession.quality_score), 0.0),
+                func.count(ExerciseSession.quality_score),
+            ).group_by(ExerciseSession.patient_id, ExerciseSession.exercise, bucket)
+            if patient_id is not None:
+                query = query.where(ExerciseSession.patient_id == patient_id)
+            session.execute(insert(ProgressRollup).from_select(columns, query))
+        session.commit()
+
+    @staticmethod
+    def get_for_patient(
+        session: Session,
+        patient_id: str,
+        period: str,
+        exercise: Optional[str] = None,
+        limit: int = 12,
+    ):
+        """Rows of the most recent `limit` periods, newest first.
+
+        `limit` counts periods, not rows, so every exercise done in a period
+        is returned with it.
+        """
+        filters = [
+            ProgressRollup.patient_id == patient_id,
+            ProgressRollup.period == period,
+        ]
+        if exercise is not None:
+            filters.append(ProgressRollup.exercise == exercise)
+        recent = (
+            select(ProgressRollup.period_start)
+            .where(*filters)
+            .distinct()
+            .order_by(ProgressRollup.period_start.desc())
+            .limit(limit)
+            .subquery()
+        )
+        # A range bound, so the outer scan stops at the oldest period wanted
+        oldest = select(func.min(recent.c.period_start)).scalar_subquery()
+        return (
+            session.query(ProgressRollup)
+            .filter(*filters, ProgressRollup.period_start >= oldest)
+            .order_by(ProgressRollup.period_start.desc(), ProgressRollup.exercise)
+            .all()
+        )
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import JSON, DateTime, Float, Index, String, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, Mapped, mapped_column
+
+from ..session import Base
+from .progress import ProgressRollup
+from api.exceptions import ReportJobNotFound
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# At most one job per cache key in these states (see uq_report_job_cache_key)
+ACTIVE = (QUEUED, RUNNING, DONE)
+
+
+def data_version(session: Session, patient_id: str) -> str:
+    """Changes whenever a session is ingested for the patient (or rollups rebuilt)"""
+    updated_at, session_count = session.execute(
+        select(
+            func.max(ProgressRollup.updated_at),
+            func.coalesce(func.sum(ProgressRollup.session_count), 0),
+        ).where(
+            ProgressRollup.patient_id == patient_id,
+            ProgressRollup.period == "all",
+        )
+    ).one()
+    return f"{session_count}:{updated_at.isoformat() if updated_at else '-'}"
+
+
+def cache_key(patient_id: str, kind: str, format: str, params: dict, version: str):
+    payload = json.dumps(
+        [patient_id, kind, format, params, version], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportJob(Base):
+    __tablename__ = "report_job"
+    __table_args__ = (
+        Index(
+            "uq_report_job_cache_key",
+            "cache_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running', 'done')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    patient_id: Mapped[str] = mapped_column(String(100))
+    kind: Mapped[str] = mapped_column(String(50))
+    format: Mapped[str] = mapped_column(String(10))
+    params: Mapped[dict] = mapped_column(JSON, default=dict)
+    data_version: Mapped[str] = mapped_column(String(100))
+    cache_key: Mapped[str] = mapped_column(String(64), index=True)
+    status: Mapped[str] = mapped_column(String(20), default=QUEUED, index=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    result_path: Mapped[str] = mapped_column(String(500), nullable=True)
+    error: Mapped[str] = mapped_column(String(5000), nullable=True)
+    worker_id: Mapped[str] = mapped_column(String(100), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __str__(self):
+        return f"id: {self.id}, kind: {self.kind}, format: {self.format}, patient_id: {self.patient_id}, status: {self.status}"
+
+    @staticmethod
+    def enqueue(
+        session: Session, patient_id: str, kind: str, format: str, params: dict
+    ):
+        """Queue a report, or return the job that already covers the same input"""
+        version = data_version(session, patient_id)
+        key = cache_key(patient_id, kind, format, params, version)
+
+        existing = ReportJob.get_active(session, key)
+        if existing is None:
+            # Identical concurrent requests race here; the unique index lets one in
+            statement = (
+                insert(ReportJob)
+                .values(
+                    patient_id=patient_id,
+                    kind=kind,
+                    format=format,
+                    params=params,
+                    data_version=version,
+                    cache_key=key,
+                    status=QUEUED,
+                    progress=0.0,
+                )
+                .on_conflict_do_nothing(
+                    index_elements=["cache_key"],
+                    index_where=ReportJob.status.in_(ACTIVE),
+                )
+            )
+            session.execute(statement)
+            session.commit()
+            return ReportJob.get_active(session, key)
+
+        existing.requeue_if_missing(session)
+        return existing
+
+    def requeue_if_missing(self, session: Session) -> bool:
+        """Render a done job again under the same id if its file is gone"""
+        if self.status != DONE or os.path.exists(self.result_path):
+            return False
+        self.status = QUEUED
+        self.progress = 0.0
+        self.result_path = None
+        self.worker_id = None
+        self.finished_at = None
+        session.commit()
+        return True
+
+    @staticmethod
+    def get_active(session: Session, cache_key: str) -> Optional["ReportJob"]:
+        return (
+            session.query(ReportJob)
+            .filter(ReportJob.cache_key == cache_key, ReportJob.status.in_(ACTIVE))
+            .first()
+        )
+
+    @staticmethod
+    def get_job_by_id(session: Session, job_id: int):
+        job = session.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if not job:
+            raise ReportJobNotFound(job_id)
+        return job
+
+    @staticmethod
+    def claim(session: Session, worker_id: str) -> Optional["ReportJob"]:
+        """Take the oldest queued job; concurrent workers skip rows already locked"""
+        job = (
+            session.query(ReportJob)
+            .filter(ReportJob.status == QUEUED)
+            .order_by(ReportJob.id)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+            .first()
+        )
+        if job is None:
+            session.rollback()
+            return None
+        job.status = RUNNING
+        job.worker_id = worker_id
+        job.started_at = datetime.now()
+        job.progress = 0.0
+        session.commit()
+        return job
+
+    @staticmethod
+    def requeue_stale(
+        session: Session, timeout: timedelta, exclude_ids: Iterable[int] = ()
+    ) -> int:
+        """Put back jobs whose worker died mid-run.
+
+        `exclude_ids` are jobs the calling worker is still rendering itself.
+        """
+        query = session.query(ReportJob).filter(
+            ReportJob.status == RUNNING,
+            ReportJob.started_at < datetime.now() - timeout,
+        )
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            query = query.filter(ReportJob.id.notin_(exclude_ids))
+        requeued = query.update(
+            {"status": QUEUED, "worker_id": None}, synchronize_session=False
+        )
+        session.commit()
+        return requeued
+
+    @staticmethod
+    def rekey(session: Session, job_id: int, worker_id: str, version: str) -> bool:
+        """Move a running job to the data version it is actually rendered from.
+
+        Fails if the worker no longer owns the job or another active job
+        already covers the new version.
+        """
+        job = session.get(ReportJob, job_id)
+        try:
+            updated = (
+                session.query(ReportJob)
+                .filter(
+                    ReportJob.id == job_id,
+                    ReportJob.status == RUNNING,
+                    ReportJob.worker_id == worker_id,
+                )
+                .update(
+                    {
+                        "data_version": version,
+                        "cache_key": cache_key(
+                            job.patient_id, job.kind, job.format, job.params, version
+                        ),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return False
+        return updated == 1
+
+    def set_progress(self, session: Session, progress: float):
+        self.progress = progress
+        session.commit()
+
+    @staticmethod
+    def _complete(session: Session, job_id: int, worker_id: str, **values) -> bool:
+        """Only the worker that still owns the job may complete it"""
+        updated = (
+            session.query(ReportJob)
+            .filter(
+                ReportJob.id == job_id,
+                ReportJob.status == RUNNING,
+                ReportJob.worker_id == worker_id,
+            )
+            .update(
+                {**values, "finished_at": datetime.now()}, synchronize_session=False
+            )
+        )
+        session.commit()
+        return updated == 1
+
+    @staticmethod
+    def finish(session: Session, job_id: int, worker_id: str, result_path: str):
+        return ReportJob._complete(
+            session,
+            job_id,
+            worker_id,
+            status=DONE,
+            progress=1.0,
+            result_path=result_path,
+        )
+
+    @staticmethod
+    def fail(session: Session, job_id: int, worker_id: str, error: str):
+        return ReportJob._complete(
+            session, job_id, worker_id, status=FAILED, error=error[:5000]
+        )
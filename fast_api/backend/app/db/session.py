@@ -5,11 +5,17 @@ from env import get_env
 
 env = get_env()
 
-DB_URI = (
+DB_URI = env.database_url or (
     f"postgresql://{env.postgres_user}:{env.postgres_password}@"
     f"{env.postgres_host}:{env.postgres_port}/{env.postgres_database}"
 )
-engine = create_engine(DB_URI)
+engine = create_engine(
+    DB_URI,
+    pool_size=env.db_pool_size,
+    max_overflow=env.db_max_overflow,
+    pool_recycle=env.db_pool_recycle,
+    pool_pre_ping=True,
+)
 Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -28,3 +34,14 @@ class DBSession:
 async def get_db():
     with DBSession() as db:
         yield db
+
+
+def warm_pool(size: int = env.db_pool_size):
+    """Open `size` connections up front so the first requests don't pay for them"""
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
@@ -1,17 +1,71 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Env(BaseSettings):
     port: int = 8000
     host: str = "0.0.0.0"
 
-    postgres_user: str
-    postgres_password: str
-    postgres_database: str
-    postgres_host: str
-    postgres_port: int
-    postgres_image_tag: str
+    # Production launch
+    workers: int = 1
+    migrate_on_startup: bool = True
+    migration_lock_id: int = 7_300_026
+
+    # Required unless database_url is set
+    postgres_user: Optional[str] = None
+    postgres_password: Optional[str] = None
+    postgres_database: Optional[str] = None
+    postgres_host: Optional[str] = None
+    postgres_port: Optional[int] = None
+    postgres_image_tag: Optional[str] = None
+    # Full SQLAlchemy URL; overrides the postgres_* settings (load tests, tooling)
+    database_url: Optional[str] = None
+
+    # Connection pool (per worker process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+
+    # Report jobs
+    reports_dir: str = "reports"
+    report_job_timeout: int = 600
+    report_workers: int = 2
+
+    # Session uploads from the desktop sync client
+    uploads_dir: str = "uploads"
+    session_archive_dir: str = "session_archive"
+
+    # Observability
+    slow_query_ms: float = 100.0
+    slow_request_ms: float = 1000.0
+    query_count_warning: int = 20
+
+    # Live pose streams
+    live_subscriber_buffer: int = 64
+    live_max_consecutive_drops: int = 300
+
+    @model_validator(mode="after")
+    def check_database_settings(self):
+        if self.database_url is None:
+            missing = [
+                name
+                for name in (
+                    "postgres_user",
+                    "postgres_password",
+                    "postgres_database",
+                    "postgres_host",
+                    "postgres_port",
+                    "postgres_image_tag",
+                )
+                if getattr(self, name) is None
+            ]
+            if missing:
+                raise ValueError(
+                    f"Set database_url or all of the postgres settings: {missing}"
+                )
+        return self
 
     class Config:
         env_file = ".env"
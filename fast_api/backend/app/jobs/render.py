@@ -0,0 +1,107 @@
+import csv
+from typing import List
+
+COLUMNS = [
+    ("period_start", "Period"),
+    ("exercise", "Exercise"),
+    ("session_count", "Sessions"),
+    ("rep_count", "Reps"),
+    ("duration_seconds", "Duration [s]"),
+    ("rom_avg", "ROM avg [deg]"),
+    ("rom_min", "ROM min"),
+    ("rom_max", "ROM max"),
+    ("quality_avg", "Quality"),
+]
+
+PDF_LINES_PER_PAGE = 48
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def render_csv(title: str, rows: List[dict], path: str) -> str:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([label for _, label in COLUMNS])
+        for row in rows:
+            writer.writerow([_cell(row.get(key)) for key, _ in COLUMNS])
+    return path
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(title: str, rows: List[dict], path: str) -> str:
+    """Plain text-table PDF, written by hand to keep the backend dependency-free"""
+    widths = [max(len(label), 10) + 2 for _, label in COLUMNS]
+    header = "".join(label.ljust(w) for (_, label), w in zip(COLUMNS, widths))
+    lines = [
+        "".join(
+            _cell(row.get(key))[: w - 1].ljust(w)
+            for (key, _), w in zip(COLUMNS, widths)
+        )
+        for row in rows
+    ] or ["No sessions recorded"]
+
+    pages = [
+        lines[i : i + PDF_LINES_PER_PAGE]
+        for i in range(0, len(lines), PDF_LINES_PER_PAGE)
+    ]
+
+    # Object 1: catalog, 2: page tree, 3: font, then a (page, content) pair per page
+    objects = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>")
+    for number, page_lines in enumerate(pages, start=1):
+        text = [
+            "BT /F1 12 Tf 40 800 Td 14 TL",
+            f"({_pdf_escape(title)} - page {number}/{len(pages)}) Tj T*",
+            "/F1 7 Tf T*",
+            f"({_pdf_escape(header)}) Tj T*",
+        ]
+        text += [f"({_pdf_escape(line)}) Tj T*" for line in page_lines]
+        text.append("ET")
+        stream = "\n".join(text).encode("latin-1", "replace")
+        content_id = 4 + 2 * (number - 1) + 1
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+RENDERERS = {"csv": render_csv, "pdf": render_pdf}
+
+
+def render(format: str, title: str, rows: List[dict], path: str) -> str:
+    """Runs in a worker process; takes only plain data so it pickles cheaply"""
+    return RENDERERS[format](title, rows, path)
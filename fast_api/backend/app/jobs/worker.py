@@ -0,0 +1,113 @@
+import logging
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from env import get_env
+from db.models.progress import ProgressRollup
+from db.models.report import ReportJob, data_version
+from db.session import DBSession
+from .render import render
+
+logger = logging.getLogger(__name__)
+
+
+def load_rows(db, job: ReportJob):
+    """The job's rows and the data version they were read at, from one snapshot"""
+    # Isolation can only be set before the transaction starts
+    db.commit()
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    version = data_version(db, job.patient_id)
+    period = job.params.get("period", "week")
+    limit = job.params.get("limit", 52)
+    rollups = ProgressRollup.get_for_patient(
+        db, job.patient_id, period, job.params.get("exercise"), limit
+    )
+    rows = [
+        {
+            "period_start": rollup.period_start.isoformat(),
+            "exercise": rollup.exercise,
+            "session_count": rollup.session_count,
+            "rep_count": rollup.rep_count,
+            "duration_seconds": rollup.duration_seconds,
+            "rom_avg": rollup.rom_avg,
+            "rom_min": rollup.rom_min,
+            "rom_max": rollup.rom_max,
+            "quality_avg": rollup.quality_avg,
+        }
+        for rollup in rollups
+    ]
+    db.commit()
+    return version, rows
+
+
+def run_worker(concurrency: int, poll_interval: float = 1.0):
+    """Claim report jobs and render them in a local process pool.
+
+    Each claim/update is its own short transaction; rendering happens outside
+    of any DB session so a slow report never holds locks or connections.
+    """
+    env = get_env()
+    os.makedirs(env.reports_dir, exist_ok=True)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stale_after = timedelta(seconds=env.report_job_timeout)
+    in_flight = {}
+
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            while len(in_flight) < concurrency:
+                with DBSession() as db:
+                    ReportJob.requeue_stale(db, stale_after, in_flight.values())
+                    job = ReportJob.claim(db, worker_id)
+                    if job is None:
+                        break
+                    logger.info("Claimed report job %s", job)
+                    try:
+                        version, rows = load_rows(db, job)
+                    except Exception as e:
+                        logger.exception("Loading data for report job %s failed", job)
+                        db.rollback()
+                        ReportJob.fail(db, job.id, worker_id, repr(e))
+                        continue
+                    # Sessions ingested since the job was queued are in `rows`
+                    if version != job.data_version and not ReportJob.rekey(
+                        db, job.id, worker_id, version
+                    ):
+                        ReportJob.fail(
+                            db,
+                            job.id,
+                            worker_id,
+                            f"Data changed to version {version}, "
+                            "which another job already covers",
+                        )
+                        continue
+                    job.set_progress(db, 0.5)
+                    filename = f"report_{job.id}_{job.cache_key[:12]}.{job.format}"
+                    path = os.path.abspath(os.path.join(env.reports_dir, filename))
+                    title = f"{job.kind.capitalize()} report - {job.patient_id}"
+                    future = pool.submit(render, job.format, title, rows, path)
+                    in_flight[future] = job.id
+
+            if not in_flight:
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(
+                in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                job_id = in_flight.pop(future)
+                with DBSession() as db:
+                    try:
+                        path = future.result()
+                    except Exception as e:
+                        logger.exception("Report job %s failed", job_id)
+                        ReportJob.fail(db, job_id, worker_id, repr(e))
+                        continue
+                    if ReportJob.finish(db, job_id, worker_id, path):
+                        logger.info("Finished report job %s", job_id)
+                    else:
+                        # Requeued or deleted meanwhile; the owner's result wins
+                        logger.warning("Discarding result of report job %s", job_id)
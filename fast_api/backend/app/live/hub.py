@@ -0,0 +1,88 @@
+"""In-process pub/sub for live pose streams.
+
+Frames are opaque bytes (see FRAME_SIZE); the hub never awaits while fanning
+out, so one slow therapist connection cannot hold up the publisher or the
+other subscribers. Streams are per worker process: publishers and their
+viewers have to reach the same worker (run live traffic on one worker or use
+sticky routing).
+"""
+import asyncio
+import struct
+from typing import Dict, Set
+
+# seq: u32, capture time: f64 (unix seconds), 17 x (y, x, score) as u16 / 65535
+FRAME_HEADER = struct.Struct("<Id")
+FRAME_SIZE = FRAME_HEADER.size + 17 * 3 * 2
+
+
+class Subscriber:
+    """Bounded per-viewer buffer that drops the oldest frame when full"""
+
+    def __init__(self, buffer_size: int, max_consecutive_drops: int):
+        self.queue: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.max_consecutive_drops = max_consecutive_drops
+        self.consecutive_drops = 0
+        self.dropped = 0
+        self.evicted = asyncio.Event()
+
+    def offer(self, frame: bytes):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.consecutive_drops += 1
+            if self.consecutive_drops > self.max_consecutive_drops:
+                # Not draining at all; free the slot for a viewer that keeps up
+                self.evicted.set()
+        self.queue.put_nowait(frame)
+
+    async def next_frame(self) -> bytes:
+        frame = await self.queue.get()
+        self.consecutive_drops = 0
+        return frame
+
+
+class LiveHub:
+    def __init__(self):
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.publishers: Dict[str, int] = {}
+        self.frames_published = 0
+
+    def subscribe(
+        self, patient_id: str, buffer_size: int, max_consecutive_drops: int
+    ) -> Subscriber:
+        subscriber = Subscriber(buffer_size, max_consecutive_drops)
+        self.subscribers.setdefault(patient_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, patient_id: str, subscriber: Subscriber):
+        subscribers = self.subscribers.get(patient_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[patient_id]
+
+    def publisher_connected(self, patient_id: str):
+        self.publishers[patient_id] = self.publishers.get(patient_id, 0) + 1
+
+    def publisher_disconnected(self, patient_id: str):
+        self.publishers[patient_id] -= 1
+        if not self.publishers[patient_id]:
+            del self.publishers[patient_id]
+
+    def publish(self, patient_id: str, frame: bytes):
+        self.frames_published += 1
+        for subscriber in self.subscribers.get(patient_id, ()):
+            subscriber.offer(frame)
+
+    def streams(self):
+        return [
+            {
+                "patient_id": patient_id,
+                "publishers": publishers,
+                "subscribers": len(self.subscribers.get(patient_id, ())),
+            }
+            for patient_id, publishers in sorted(self.publishers.items())
+        ]
+
+
+hub = LiveHub()
@@ -1,8 +1,18 @@
 import logging
-import subprocess
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from env import get_env
+from api.endpoints import live, progress, reports, uploads
+from db.session import engine, warm_pool
+from observability import install_observability
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_pool()
+    yield
+    engine.dispose()
 
 
 def create_app():
@@ -23,9 +33,16 @@ def create_app():
         redoc_url="/redoc",
         version="0.1.0",
         title="entrustment",
+        lifespan=lifespan,
     )
-    # unnecessary code
-    # DB migrations
-    subprocess.run(["alembic", "upgrade", "head"])
+    # DB migrations are applied once by run.py (or `run.py migrate`),
+    # not by every worker building an app instance
+
+    install_observability(app, engine)
+
+    app.include_router(progress.router)
+    app.include_router(reports.router)
+    app.include_router(uploads.router)
+    app.include_router(live.router)
 
     return app
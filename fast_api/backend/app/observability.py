@@ -0,0 +1,213 @@
+"""Per-request latency and DB metrics, exposed on /metrics in Prometheus format.
+
+Metrics live in process memory, so with several workers each scrape sees one
+worker; the `worker` label tells them apart.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from env import get_env
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def exposition(self, name: str, labels: str) -> list:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.3f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RequestStats:
+    __slots__ = ("route", "queries", "db_time_ms")
+
+    def __init__(self):
+        self.route = None
+        self.queries = 0
+        self.db_time_ms = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+class Metrics:
+    """Histograms keyed by (method, route template)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.db_queries: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.slow_queries = 0
+
+    def observe_request(self, method, route, status, elapsed_ms, stats):
+        with self.lock:
+            key = (method, route, f"{status // 100}xx")
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS_MS)
+                self.db_queries.setdefault(key[:2], Histogram(QUERY_COUNT_BUCKETS))
+                self.db_time.setdefault(key[:2], Histogram(LATENCY_BUCKETS_MS))
+            self.latency[key].observe(elapsed_ms)
+            self.db_queries[key[:2]].observe(stats.queries)
+            self.db_time[key[:2]].observe(stats.db_time_ms)
+
+    def exposition(self) -> str:
+        worker = os.getpid()
+        sections = [
+            (
+                "http_request_duration_ms",
+                "Request latency by route",
+                self.latency,
+                ("method", "route", "status"),
+            ),
+            (
+                "db_queries_per_request",
+                "DB queries issued per request",
+                self.db_queries,
+                ("method", "route"),
+            ),
+            (
+                "db_time_per_request_ms",
+                "Time spent in DB queries per request",
+                self.db_time,
+                ("method", "route"),
+            ),
+        ]
+        lines = []
+        with self.lock:
+            for name, help_text, histograms, label_names in sections:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for key, histogram in sorted(histograms.items()):
+                    labels = ",".join(
+                        f'{label}="{value}"' for label, value in zip(label_names, key)
+                    )
+                    lines += histogram.exposition(name, f'worker="{worker}",{labels}')
+            lines += [
+                "# HELP db_slow_queries_total Queries over the slow query threshold",
+                "# TYPE db_slow_queries_total counter",
+                f'db_slow_queries_total{{worker="{worker}"}} {self.slow_queries}',
+            ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class ObservabilityMiddleware:
+    """Plain ASGI middleware, so it adds no task or thread hop per request"""
+
+    def __init__(self, app):
+        self.app = app
+        env = get_env()
+        self.slow_request_ms = env.slow_request_ms
+        self.query_count_warning = env.query_count_warning
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        stats.route = scope["path"]
+        token = _current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # Route template rather than raw path, to keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            stats.route = route
+            metrics.observe_request(scope["method"], route, status, elapsed_ms, stats)
+            if elapsed_ms > self.slow_request_ms:
+                logger.warning(
+                    "Slow request %s %s: %.1f ms, %d queries in %.1f ms",
+                    scope["method"],
+                    route,
+                    elapsed_ms,
+                    stats.queries,
+                    stats.db_time_ms,
+                )
+            if stats.queries > self.query_count_warning:
+                logger.warning(
+                    "%s %s issued %d queries (possible N+1)",
+                    scope["method"],
+                    route,
+                    stats.queries,
+                )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time_ms += elapsed_ms
+    if elapsed_ms > get_env().slow_query_ms:
+        with metrics.lock:
+            metrics.slow_queries += 1
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed_ms,
+            stats.route if stats else "background",
+            " ".join(statement.split())[:1000],
+        )
+
+
+def instrument_engine(engine: Engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def install_observability(app: FastAPI, engine: Engine):
+    instrument_engine(engine)
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def get_metrics():
+        return metrics.exposition()
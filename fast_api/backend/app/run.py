@@ -1,13 +1,86 @@
+import argparse
+import logging
+
 import uvicorn
 
 from env import get_env
 
 env = get_env()
 
-if __name__ == "__main__":
+
+def migrate(args):
+    from db.migrations import run_migrations
+
+    run_migrations(args.revision)
+
+
+def rebuild_rollups(args):
+    from db.models.progress import ProgressRollup
+    from db.session import DBSession
+
+    with DBSession() as db:
+        ProgressRollup.rebuild(db, args.patient)
+
+
+def report_worker(args):
+    from jobs.worker import run_worker
+
+    run_worker(args.concurrency)
+
+
+def serve(args):
+    if env.migrate_on_startup and not args.skip_migrations:
+        migrate(argparse.Namespace(revision="head"))
+
+    workers = 1 if args.reload else args.workers
     uvicorn.run(
         "main:create_app",
+        factory=True,
         host=env.host,
         port=env.port,
-        reload=True,
+        reload=args.reload,
+        workers=workers,
     )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the backend")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Start the API server")
+    serve_parser.add_argument("--workers", type=int, default=env.workers)
+    serve_parser.add_argument("--reload", action="store_true")
+    serve_parser.add_argument(
+        "--skip-migrations",
+        action="store_true",
+        help="Assume migrations were applied out of band (`run.py migrate`)",
+    )
+    serve_parser.set_defaults(func=serve)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply DB migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    migrate_parser.set_defaults(func=migrate)
+
+    rollups_parser = subparsers.add_parser(
+        "rebuild-rollups", help="Recompute progress rollups from raw sessions"
+    )
+    rollups_parser.add_argument("--patient", help="Only rebuild this patient")
+    rollups_parser.set_defaults(func=rebuild_rollups)
+
+    worker_parser = subparsers.add_parser(
+        "report-worker", help="Render queued report jobs"
+    )
+    worker_parser.add_argument("--concurrency", type=int, default=env.report_workers)
+    worker_parser.set_defaults(func=report_worker)
+
+    args = parser.parse_args()
+    if args.command is None:
+        # Development default: single auto-reloading worker
+        args = parser.parse_args(["serve", "--reload"])
+    return args
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    args.func(args)
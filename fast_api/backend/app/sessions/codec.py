@@ -0,0 +1,112 @@
+"""Decoder for the compact session format uploaded by the desktop sync client.
+
+Layout (little-endian)::
+
+    b"PSES" | version: u8 | header length: u32 | header JSON | zlib(payload)
+
+The payload holds one int32 per frame (milliseconds since the previous frame)
+followed by the 17 x (y, x, confidence) keypoint channels, each channel stored
+contiguously as int16 deltas of values quantized to 1 / SCALE. Must stay in
+sync with desktop_app/backend/sync.py.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+MAGIC = b"PSES"
+VERSION = 1
+SCALE = 4096
+CHANNELS = 17 * 3
+PREAMBLE = struct.Struct("<4sBI")
+
+
+class SessionDecodeError(ValueError):
+    pass
+
+
+def _read(raw: bytes, typecode: str) -> array:
+    values = array(typecode)
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode_session(session: dict) -> bytes:
+    """Pure-Python counterpart of the desktop encoder (tests, load generation)"""
+    poses = session["poses"]
+    frames = len(poses)
+    timestamps = [datetime.fromisoformat(pose["timestamp"]) for pose in poses]
+    started_at = timestamps[0]
+
+    offsets_ms = [round((t - started_at).total_seconds() * 1000) for t in timestamps]
+    frame_ms = array("i", (b - a for a, b in zip([0] + offsets_ms, offsets_ms)))
+
+    deltas = array("h")
+    for c in range(CHANNELS):
+        previous = 0
+        for pose in poses:
+            value = min(max(round(pose["keypoints"][c // 3][c % 3] * SCALE), 0), 32767)
+            deltas.append(value - previous)
+            previous = value
+
+    if sys.byteorder == "big":
+        frame_ms.byteswap()
+        deltas.byteswap()
+    header = json.dumps(
+        {
+            "metadata": session["metadata"],
+            "started_at": started_at.isoformat(),
+            "frame_shape": poses[0].get("frame_shape"),
+            "frames": frames,
+        }
+    ).encode()
+    payload = zlib.compress(frame_ms.tobytes() + deltas.tobytes(), 9)
+    return PREAMBLE.pack(MAGIC, VERSION, len(header)) + header + payload
+
+
+def decode_session(blob: bytes) -> dict:
+    """Return the session as {"metadata": ..., "poses": [...]} like the desktop JSON"""
+    if len(blob) < PREAMBLE.size:
+        raise SessionDecodeError("Truncated session")
+    magic, version, header_length = PREAMBLE.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise SessionDecodeError(f"Unsupported session format {magic!r} v{version}")
+
+    header_end = PREAMBLE.size + header_length
+    try:
+        header = json.loads(blob[PREAMBLE.size : header_end])
+        raw = zlib.decompress(blob[header_end:])
+    except (ValueError, zlib.error) as e:
+        raise SessionDecodeError(str(e)) from e
+
+    frames = header["frames"]
+    if len(raw) != frames * 4 + frames * CHANNELS * 2:
+        raise SessionDecodeError("Payload size doesn't match frame count")
+
+    offsets_ms = list(accumulate(_read(raw[: frames * 4], "i")))
+    deltas = _read(raw[frames * 4 :], "h")
+    channels = [
+        list(accumulate(deltas[c * frames : (c + 1) * frames]))
+        for c in range(CHANNELS)
+    ]
+
+    started_at = datetime.fromisoformat(header["started_at"])
+    poses = []
+    for i in range(frames):
+        keypoints = [
+            [
+                channels[k * 3][i] / SCALE,
+                channels[k * 3 + 1][i] / SCALE,
+                channels[k * 3 + 2][i] / SCALE,
+            ]
+            for k in range(17)
+        ]
+        timestamp = started_at + timedelta(milliseconds=offsets_ms[i])
+        poses.append({"timestamp": timestamp.isoformat(), "keypoints": keypoints})
+
+    return {"metadata": header["metadata"], "poses": poses}
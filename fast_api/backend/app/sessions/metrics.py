@@ -0,0 +1,71 @@
+import math
+from datetime import datetime
+from typing import List, Optional
+
+# (a, b, c) keypoint triplets; the angle is measured at b
+JOINT_ANGLES = {
+    "left_elbow": (5, 7, 9),
+    "right_elbow": (6, 8, 10),
+    "left_shoulder": (11, 5, 7),
+    "right_shoulder": (12, 6, 8),
+    "left_hip": (5, 11, 13),
+    "right_hip": (6, 12, 14),
+    "left_knee": (11, 13, 15),
+    "right_knee": (12, 14, 16),
+}
+
+# Joints whose range of motion matters for an exercise; others use all joints
+EXERCISE_JOINTS = {
+    "squat": ("left_knee", "right_knee", "left_hip", "right_hip"),
+    "lunge": ("left_knee", "right_knee"),
+    "arm_raise": ("left_shoulder", "right_shoulder"),
+}
+
+QUALITY_SCORES = {"good": 1.0, "warning": 0.5, "bad": 0.0}
+
+MIN_CONFIDENCE = 0.3
+
+
+def joint_angle(
+    keypoints: List[List[float]], a: int, b: int, c: int
+) -> Optional[float]:
+    (ya, xa, ca), (yb, xb, cb), (yc, xc, cc) = (keypoints[i] for i in (a, b, c))
+    if min(ca, cb, cc) < MIN_CONFIDENCE:
+        return None
+    angle = math.degrees(math.atan2(yc - yb, xc - xb) - math.atan2(ya - yb, xa - xb))
+    angle = abs(angle) % 360
+    return 360 - angle if angle > 180 else angle
+
+
+def range_of_motion(poses: List[dict], exercise: str) -> Optional[float]:
+    """Largest angle range (degrees) covered by any of the exercise's joints"""
+    best = None
+    for joint in EXERCISE_JOINTS.get(exercise, JOINT_ANGLES):
+        angles = [
+            angle
+            for pose in poses
+            if (angle := joint_angle(pose["keypoints"], *JOINT_ANGLES[joint]))
+            is not None
+        ]
+        if angles:
+            spread = max(angles) - min(angles)
+            best = spread if best is None else max(best, spread)
+    return best
+
+
+def summarize_session(session: dict) -> dict:
+    """ExerciseSession fields for a decoded desktop session"""
+    metadata = session["metadata"]
+    poses = session["poses"]
+    started_at = datetime.fromisoformat(poses[0]["timestamp"]) if poses else None
+    ended_at = datetime.fromisoformat(poses[-1]["timestamp"]) if poses else None
+    return {
+        "patient_id": str(metadata["participant_id"]),
+        "exercise": metadata["exercise"],
+        "started_at": started_at or datetime.now(),
+        "duration_seconds": (ended_at - started_at).total_seconds() if poses else 0.0,
+        "frame_count": len(poses),
+        "rep_count": metadata.get("rep_count", 1),
+        "rom_degrees": range_of_motion(poses, metadata["exercise"]),
+        "quality_score": QUALITY_SCORES.get(metadata.get("quality")),
+    }
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from env import get_env
+from api.exceptions import UploadInvalid, UploadNotFound, UploadOffsetMismatch
+
+
+class UploadStore:
+    """Resumable uploads on local disk.
+
+    A partial upload is `<uploads_dir>/<id>.part` plus a `<id>.json` sidecar with
+    the declared size and checksum; the number of bytes on disk is the resume
+    offset. Completed uploads move to `<session_archive_dir>/<id>.pses`.
+    """
+
+    def __init__(self, uploads_dir: str, archive_dir: str):
+        self.uploads_dir = uploads_dir
+        self.archive_dir = archive_dir
+        os.makedirs(uploads_dir, exist_ok=True)
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f"{upload_id}.json")
+
+    def archive_path(self, upload_id: str) -> str:
+        return os.path.join(self.archive_dir, f"{upload_id}.pses")
+
+    def _meta(self, upload_id: str) -> dict:
+        try:
+            with open(self._meta_path(upload_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadNotFound(upload_id)
+
+    def create(self, upload_id: str, size: int, sha256: str) -> int:
+        """Start an upload, or report progress of one already started"""
+        if os.path.exists(self.archive_path(upload_id)):
+            return size
+        if not os.path.exists(self._meta_path(upload_id)):
+            with open(self._meta_path(upload_id), "w") as f:
+                json.dump({"size": size, "sha256": sha256}, f)
+            open(self._part_path(upload_id), "wb").close()
+        return self.received(upload_id)
+
+    def size(self, upload_id: str) -> int:
+        if os.path.exists(self.archive_path(upload_id)):
+            return os.path.getsize(self.archive_path(upload_id))
+        return self._meta(upload_id)["size"]
+
+    def received(self, upload_id: str) -> int:
+        if os.path.exists(self.archive_path(upload_id)):
+            return os.path.getsize(self.archive_path(upload_id))
+        self._meta(upload_id)
+        return os.path.getsize(self._part_path(upload_id))
+
+    def append(self, upload_id: str, offset: int, data: bytes) -> int:
+        meta = self._meta(upload_id)
+        received = self.received(upload_id)
+        if offset > received:
+            raise UploadOffsetMismatch(upload_id, received)
+        # Chunks re-sent after a lost response overlap what we already have
+        data = data[received - offset :]
+        if received + len(data) > meta["size"]:
+            raise UploadInvalid(upload_id, "more data than declared")
+        with open(self._part_path(upload_id), "ab") as f:
+            f.write(data)
+        return received + len(data)
+
+    def complete(self, upload_id: str) -> Optional[bytes]:
+        """Verify and archive a finished upload; None if it was archived before"""
+        if os.path.exists(self.archive_path(upload_id)):
+            return None
+        meta = self._meta(upload_id)
+        with open(self._part_path(upload_id), "rb") as f:
+            blob = f.read()
+        if len(blob) != meta["size"]:
+            raise UploadOffsetMismatch(upload_id, len(blob))
+        if hashlib.sha256(blob).hexdigest() != meta["sha256"]:
+            os.remove(self._part_path(upload_id))
+            os.remove(self._meta_path(upload_id))
+            raise UploadInvalid(upload_id, "checksum mismatch")
+        os.replace(self._part_path(upload_id), self.archive_path(upload_id))
+        os.remove(self._meta_path(upload_id))
+        return blob
+
+
+def get_upload_store():
+    env = get_env()
+    return UploadStore(env.uploads_dir, env.session_archive_dir)
@@ -0,0 +1,206 @@
+"""Async load generator for the backend.
+
+Run from fast_api/backend, e.g.::
+
+    python -m loadtest run --ephemeral-db --users 50 --duration 60 --save baseline
+    python -m loadtest run --base-url http://localhost:8000 --compare baseline
+    python -m loadtest compare baseline results/today.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+import httpx
+
+from .scenarios import DEFAULT_MIX, SCENARIOS, Context, parse_mix, seed
+from .stats import (
+    DEFAULT_THRESHOLD,
+    ScenarioStats,
+    build_result,
+    compare,
+    format_result,
+    load_result,
+    save_result,
+)
+
+# Same working directory as the Dockerfile, so `.env` is picked up
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@contextmanager
+def ephemeral_database():
+    """Throwaway local Postgres, via the optional `pgserver` package"""
+    try:
+        import pgserver
+    except ImportError:
+        sys.exit("--ephemeral-db needs `pip install pgserver`")
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = pgserver.get_server(data_dir, cleanup_mode="stop")
+        try:
+            yield server.get_uri()
+        finally:
+            server.cleanup()
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited with code {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/openapi.json", timeout=1).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    sys.exit("Server did not become ready")
+
+
+@contextmanager
+def local_server(args):
+    """Start the app the way production does: migrate once, then N workers"""
+    env = dict(os.environ, PORT=str(args.port), HOST="127.0.0.1")
+    with ExitStack() as stack:
+        data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        env["UPLOADS_DIR"] = os.path.join(data_dir, "uploads")
+        env["SESSION_ARCHIVE_DIR"] = os.path.join(data_dir, "archive")
+        if args.ephemeral_db:
+            env["DATABASE_URL"] = stack.enter_context(ephemeral_database())
+
+        subprocess.run(
+            [sys.executable, "app/run.py", "migrate"],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+        )
+        command = ["app/run.py", "serve", "--skip-migrations", "--workers"]
+        process = subprocess.Popen(
+            [sys.executable, *command, str(args.workers)], cwd=BACKEND_DIR, env=env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_until_ready(base_url, process)
+            yield base_url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+async def virtual_user(client, ctx, mix, stats, stop_at, record_after):
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < stop_at:
+        name = random.choices(names, weights)[0]
+        started = time.perf_counter()
+        error = None
+        try:
+            await SCENARIOS[name](client, ctx)
+        except httpx.HTTPStatusError as e:
+            error = f"HTTP {e.response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        if time.monotonic() >= record_after:
+            stats[name].record((time.perf_counter() - started) * 1000, error)
+
+
+async def drive(base_url: str, args, mix: dict) -> dict:
+    ctx = Context(args.patients, args.frames, args.stream_path)
+    limits = httpx.Limits(max_connections=args.users)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        await seed(client, ctx, args.seed_sessions)
+        stats = {name: ScenarioStats() for name in mix}
+        record_after = time.monotonic() + args.warmup
+        stop_at = record_after + args.duration
+        await asyncio.gather(
+            *(
+                virtual_user(client, ctx, mix, stats, stop_at, record_after)
+                for _ in range(args.users)
+            )
+        )
+    config = {
+        key: getattr(args, key)
+        for key in ("users", "duration", "warmup", "workers", "patients", "frames")
+    }
+    config["mix"] = mix
+    config["base_url"] = base_url
+    return build_result(config, stats, args.duration)
+
+
+def run(args) -> int:
+    mix = {name: w for name, w in parse_mix(args.mix).items() if w > 0} or DEFAULT_MIX
+    if args.base_url:
+        result = asyncio.run(drive(args.base_url.rstrip("/"), args, mix))
+    else:
+        with local_server(args) as base_url:
+            result = asyncio.run(drive(base_url, args, mix))
+
+    print(format_result(result))
+    if args.save:
+        print(f"Saved {save_result(result, args.save)}")
+    if args.compare:
+        return report_comparison(load_result(args.compare), result, args.threshold)
+    return 0
+
+
+def report_comparison(baseline: dict, current: dict, threshold: float) -> int:
+    lines, regressions = compare(baseline, current, threshold)
+    print(
+        f"\nAgainst baseline from {baseline['created_at']} "
+        f"({baseline['git_revision']})"
+    )
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Drive traffic and report")
+    run_parser.add_argument("--base-url", help="Test a running server instead")
+    run_parser.add_argument("--ephemeral-db", action="store_true")
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--users", type=int, default=20)
+    run_parser.add_argument("--duration", type=float, default=30)
+    run_parser.add_argument("--warmup", type=float, default=3)
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument(
+        "--mix",
+        default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+        help=f"Scenario weights, any of {', '.join(SCENARIOS)}",
+    )
+    run_parser.add_argument("--patients", type=int, default=50)
+    run_parser.add_argument("--seed-sessions", type=int, default=20)
+    run_parser.add_argument("--frames", type=int, default=300)
+    run_parser.add_argument("--stream-path", default="/live/{patient_id}/publish")
+    run_parser.add_argument("--save", metavar="NAME", help="Store under results/")
+    run_parser.add_argument("--compare", metavar="BASELINE")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.set_defaults(
+        func=lambda args: report_comparison(
+            load_result(args.baseline), load_result(args.current), args.threshold
+        )
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.func(args))
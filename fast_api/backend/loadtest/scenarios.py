@@ -0,0 +1,155 @@
+import hashlib
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from live.hub import FRAME_HEADER  # noqa: E402
+from sessions.codec import encode_session  # noqa: E402
+
+EXERCISES = ("squat", "lunge", "arm_raise")
+
+
+class Context:
+    """Shared, pre-generated inputs so scenarios measure the server, not the client"""
+
+    def __init__(self, patients: int, frames: int, stream_path: str):
+        self.patients = [f"load_patient_{i:04d}" for i in range(patients)]
+        self.session_blobs = [
+            encode_session(synthetic_session(patient, frames))
+            for patient in self.patients[:8]
+        ]
+        self.stream_path = stream_path
+
+
+def synthetic_session(patient_id: str, frames: int, started_at: datetime = None):
+    started_at = started_at or datetime(2026, 1, 1, 9, 0)
+    phases = [random.uniform(0, math.pi) for _ in range(17)]
+    poses = []
+    for i in range(frames):
+        keypoints = [
+            [
+                0.5 + 0.3 * math.sin(i / 15 + phase),
+                0.5 + 0.2 * math.cos(i / 20 + phase),
+                0.9,
+            ]
+            for phase in phases
+        ]
+        timestamp = started_at + timedelta(milliseconds=33 * i)
+        poses.append({"timestamp": timestamp.isoformat(), "keypoints": keypoints})
+    return {
+        "metadata": {
+            "exercise": random.choice(EXERCISES),
+            "quality": random.choice(["good", "warning", "bad"]),
+            "participant_id": patient_id,
+            "rep_number": 1,
+            "total_frames": frames,
+        },
+        "poses": poses,
+    }
+
+
+async def seed(client: httpx.AsyncClient, ctx: Context, sessions_per_patient: int):
+    """Give every patient some history so reads hit real rollup rows"""
+    for patient_id in ctx.patients:
+        for day in range(sessions_per_patient):
+            started_at = datetime(2026, 1, 1) + timedelta(days=day)
+            response = await client.post(
+                "/sessions",
+                json={
+                    "patient_id": patient_id,
+                    "exercise": random.choice(EXERCISES),
+                    "started_at": started_at.isoformat(),
+                    "rep_count": random.randint(5, 15),
+                    "duration_seconds": random.uniform(30, 120),
+                    "rom_degrees": random.uniform(40, 120),
+                    "quality_score": random.random(),
+                },
+            )
+            response.raise_for_status()
+
+
+async def progress_read(client: httpx.AsyncClient, ctx: Context):
+    patient_id = random.choice(ctx.patients)
+    period = random.choice(["day", "week", "all"])
+    response = await client.get(
+        f"/patients/{patient_id}/progress", params={"period": period}
+    )
+    response.raise_for_status()
+
+
+async def report_request(client: httpx.AsyncClient, ctx: Context):
+    response = await client.post(
+        "/reports",
+        json={"patient_id": random.choice(ctx.patients), "format": "csv"},
+    )
+    response.raise_for_status()
+    job_id = response.json()["id"]
+    response = await client.get(f"/reports/{job_id}")
+    response.raise_for_status()
+
+
+async def session_upload(
+    client: httpx.AsyncClient, ctx: Context, chunk_size: int = 16384
+):
+    blob = random.choice(ctx.session_blobs)
+    upload_id = uuid.uuid4().hex
+    response = await client.post(
+        "/uploads",
+        json={
+            "upload_id": upload_id,
+            "size": len(blob),
+            "sha256": hashlib.sha256(blob).hexdigest(),
+        },
+    )
+    response.raise_for_status()
+    for offset in range(0, len(blob), chunk_size):
+        response = await client.put(
+            f"/uploads/{upload_id}",
+            params={"offset": offset},
+            content=blob[offset : offset + chunk_size],
+        )
+        response.raise_for_status()
+    response = await client.post(f"/uploads/{upload_id}/complete")
+    response.raise_for_status()
+
+
+async def pose_stream(client: httpx.AsyncClient, ctx: Context, frames: int = 90):
+    """Publish a short burst of binary pose frames over a WebSocket"""
+    import websockets
+
+    url = str(client.base_url).replace("http", "ws", 1).rstrip("/")
+    patient_id = random.choice(ctx.patients)
+    path = ctx.stream_path.format(patient_id=patient_id)
+    keypoints = bytes(17 * 3 * 2)
+    async with websockets.connect(url + path) as websocket:
+        for seq in range(frames):
+            await websocket.send(FRAME_HEADER.pack(seq, time.time()) + keypoints)
+
+
+SCENARIOS = {
+    "progress": progress_read,
+    "report": report_request,
+    "upload": session_upload,
+    "stream": pose_stream,
+}
+
+DEFAULT_MIX = {"progress": 8, "report": 1, "upload": 1, "stream": 1}
+
+
+def parse_mix(text: str) -> dict:
+    """Parse weights like `progress=8,upload=1`"""
+    mix = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}, pick from {list(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
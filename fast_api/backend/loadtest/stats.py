@@ -0,0 +1,128 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Relative change that counts as a regression when comparing against a baseline
+DEFAULT_THRESHOLD = 0.15
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ScenarioStats:
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def record(self, latency_ms: float, error: str = None):
+        if error is None:
+            self.latencies_ms.append(latency_ms)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, duration: float) -> dict:
+        latencies = sorted(self.latencies_ms)
+        failed = sum(self.errors.values())
+        total = len(latencies) + failed
+        return {
+            "requests": total,
+            "throughput_rps": len(latencies) / duration if duration else 0.0,
+            "error_rate": failed / total if total else 0.0,
+            "errors": self.errors,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_result(config: dict, stats: Dict[str, ScenarioStats], duration: float):
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "host": platform.node(),
+        "config": config,
+        "duration_s": duration,
+        "scenarios": {name: s.summary(duration) for name, s in stats.items()},
+    }
+
+
+def save_result(result: dict, name: str) -> Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{name}.json"
+    path.write_text(json.dumps(result, indent=2))
+    return path
+
+
+def load_result(name_or_path: str) -> dict:
+    path = Path(name_or_path)
+    if not path.exists():
+        path = RESULTS_DIR / f"{name_or_path}.json"
+    return json.loads(path.read_text())
+
+
+def format_result(result: dict) -> str:
+    lines = [
+        f"{'scenario':<10} {'reqs':>7} {'rps':>8} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    ]
+    for name, s in result["scenarios"].items():
+        lines.append(
+            f"{name:<10} {s['requests']:>7} {s['throughput_rps']:>8.1f} "
+            f"{s['error_rate'] * 100:>6.2f} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD):
+    """Return (report lines, regressions) for scenarios present in both runs"""
+    lines, regressions = [], []
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        checks = [
+            # metric, higher is worse
+            ("p95_ms", True),
+            ("p99_ms", True),
+            ("throughput_rps", False),
+        ]
+        for metric, higher_is_worse in checks:
+            old, new = before[metric], now[metric]
+            change = (new - old) / old if old else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            lines.append(
+                f"{name:<10} {metric:<15} {old:>9.1f} -> {new:>9.1f} "
+                f"({change * 100:+.1f}%){'  REGRESSION' if worse else ''}"
+            )
+            if worse:
+                regressions.append(f"{name}.{metric}")
+        if now["error_rate"] > before["error_rate"] + 0.01:
+            lines.append(
+                f"{name:<10} {'error_rate':<15} {before['error_rate']:>9.3f} -> "
+                f"{now['error_rate']:>9.3f}  REGRESSION"
+            )
+            regressions.append(f"{name}.error_rate")
+    return lines, regressions
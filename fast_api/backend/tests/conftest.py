@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app uses flat imports rooted at app/ (see alembic.ini prepend_sys_path)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
@@ -0,0 +1,89 @@
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from sessions.codec import (
+    SCALE,
+    SessionDecodeError,
+    decode_session,
+    encode_session,
+)
+
+DESKTOP_BACKEND = Path(__file__).resolve().parents[3] / "desktop_app" / "backend"
+
+
+def make_session(frames=90, seed=0):
+    rng = random.Random(seed)
+    started_at = datetime(2026, 3, 1, 23, 59, 58, 123000)
+    elapsed_ms = 0
+    poses = []
+    for _ in range(frames):
+        poses.append(
+            {
+                "timestamp": (
+                    started_at + timedelta(milliseconds=elapsed_ms)
+                ).isoformat(),
+                "keypoints": [
+                    [rng.random(), rng.random(), rng.random()] for _ in range(17)
+                ],
+                "frame_shape": [480, 480, 3],
+            }
+        )
+        # Uneven frame gaps, as from a real camera
+        elapsed_ms += rng.randint(25, 45)
+    metadata = {
+        "exercise": "squat",
+        "quality": "good",
+        "participant_id": "patient_001",
+        "rep_number": 1,
+        "total_frames": frames,
+    }
+    return {"metadata": metadata, "poses": poses}
+
+
+def assert_round_trip(original, decoded):
+    assert decoded["metadata"] == original["metadata"]
+    assert len(decoded["poses"]) == len(original["poses"])
+    for before, after in zip(original["poses"], decoded["poses"]):
+        assert after["timestamp"] == before["timestamp"]
+        for point_before, point_after in zip(before["keypoints"], after["keypoints"]):
+            for value_before, value_after in zip(point_before, point_after):
+                assert abs(value_after - value_before) <= 1 / SCALE
+
+
+def test_round_trip():
+    session = make_session()
+    assert_round_trip(session, decode_session(encode_session(session)))
+
+
+def test_single_frame():
+    session = make_session(frames=1)
+    assert_round_trip(session, decode_session(encode_session(session)))
+
+
+def test_desktop_encoder_matches():
+    pytest.importorskip("numpy")
+    sys.path.insert(0, str(DESKTOP_BACKEND))
+    try:
+        from sync import encode_session as desktop_encode_session
+    finally:
+        sys.path.remove(str(DESKTOP_BACKEND))
+
+    session = make_session(seed=1)
+    assert_round_trip(session, decode_session(desktop_encode_session(session)))
+
+
+@pytest.mark.parametrize(
+    "blob",
+    [
+        b"",
+        b"XXXX" + bytes(5),
+        encode_session(make_session())[:-10],
+    ],
+)
+def test_rejects_malformed(blob):
+    with pytest.raises(SessionDecodeError):
+        decode_session(blob)